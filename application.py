@@ -36,6 +36,8 @@ class Application():
         self._running = True
         self._selectedProxyName: str = None
         self._proxies: dict[(str, Proxy)] = {}
+        # Sorted local ports and names of the proxies for the completers, rebuilt after proxies change.
+        self._proxyIndex: typing.Optional[tuple[tuple[str, ...], tuple[str, ...]]] = None
         self._parsers: dict[(Proxy, ParserContainer)] = {
             None: ParserContainer('core_parser', self)}
 
@@ -217,6 +219,15 @@ class Application():
     def getProxyNameList(self) -> list[str]:
         return list(self._proxies)
 
+    # Returns the sorted local ports as strings and the sorted names of all proxies.
+    def getProxyIndex(self) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        if self._proxyIndex is None:
+            self._proxyIndex = (
+                tuple(sorted(str(proxy.getBind()[1]) for proxy in self._proxies.values())),
+                tuple(sorted(self._proxies))
+            )
+        return self._proxyIndex
+
     def getParserByProxy(self, proxy: Proxy) -> Parser:
         return self._parsers[proxy].getInstance()
 
@@ -282,6 +293,7 @@ class Application():
         # Add them to their dictionaries
         self._proxies[proxy.name] = proxy
         self._parsers[proxy] = parser
+        self._proxyIndex = None
 
         # Start the proxy thread
         proxy.start()
@@ -293,6 +305,7 @@ class Application():
             self.selectProxy(None)
 
         proxy = self._proxies.pop(proxy.name)
+        self._proxyIndex = None
         # Kill it
         proxy.shutdown()
         # Wait for the thread to finish
@@ -318,6 +331,7 @@ class Application():
             raise KeyError(f'Proxy with name {newName} already exists.')
 
         self._proxies[newName] = self._proxies.pop(proxy.name)
+        self._proxyIndex = None
         # Make sure we update the selected proxy if we rename the currently selected one.
         if self._selectedProxyName == proxy.name:
             self._selectedProxyName = newName
@@ -442,18 +456,19 @@ class Application():
         self._sess.completer = completer
         return
 
+    # Called for every packet, so the output handler is only called if there is something to print.
     def packetHandler(self, data: bytes, proxy: Proxy, origin: ESocketRole) -> typing.NoReturn:
-        parser = self.getParserByProxy(proxy)
-        output = parser.parse(data, proxy, origin)
-        self.outputHandlerFancy(output)
+        output = self._parsers[proxy].getInstance().parse(data, proxy, origin)
+        if output:
+            self.outputHandlerFancy(output)
         return
 
-    def outputHandlerPlain(self, output: list[str]) -> typing.NoReturn:
+    def outputHandlerPlain(self, output: typing.Union[typing.Sequence[str], str]) -> typing.NoReturn:
         # Don't print a new prompt if there is no output
         if output is None or len(output) == 0:
             return
         # Print the output we were given to print
-        if isinstance(output, list):
+        if isinstance(output, (list, tuple)):
             print_formatted_text('\n'.join(output))
         else:
             print_formatted_text(output)
@@ -461,12 +476,12 @@ class Application():
         sys.stdout.flush()
         return
 
-    def outputHandlerFancy(self, output: list[str]) -> typing.NoReturn:
+    def outputHandlerFancy(self, output: typing.Union[typing.Sequence[str], str]) -> typing.NoReturn:
         # Don't print a new prompt if there is no output
         if output is None or len(output) == 0:
             return
         # Print the output we were given to print
-        if isinstance(output, list):
+        if isinstance(output, (list, tuple)):
             print_formatted_text(HTML('\n'.join(output)))
         else:
             print_formatted_text(HTML(output))
@@ -27,6 +27,10 @@ if typing.TYPE_CHECKING:
     from core_parser import CommandDictType
     from buffer_status import BufferStatus
 
+# Returned by parse when there is nothing to print, so quiet packets don't allocate a list.
+# It is shared, so never append to the result of parse. Create a new list instead.
+_NO_OUTPUT: tuple[str, ...] = ()
+
 ###############################################################################
 # Define which settings are available here.
 
@@ -37,26 +41,19 @@ class EBaseSettingKey(Enum):
     PACKETNOTIFICATION_ENABLED  = auto()
     PACKET_NUMBER               = auto()
 
+    # Compared and hashed the same way as core_parser.ECoreSettingKey, see there for why.
     def __eq__(self, other: typing.Any) -> bool:
-        if other is int:
-            return self.value == other
-        if other is str:
-            return self.name == other
-        if repr(type(self)) == repr(type(other)):
-            return self.value == other.value
+        if isinstance(other, Enum) and type(other).__name__ == type(self).__name__:
+            return self._value_ == other._value_
         return False
 
     def __gt__(self, other: typing.Any) -> bool:
-        if other is int:
-            return self.value > other
-        if other is str:
-            return self.name > other
-        if repr(type(self)) == repr(type(other)):
-            return self.value > other.value
-        raise ValueError('Can not compare.')
+        if isinstance(other, Enum) and type(other).__name__ == type(self).__name__:
+            return self._value_ > other._value_
+        return NotImplemented
 
     def __hash__(self):
-        return self.value.__hash__()
+        return self._value_
 
 
 class Parser(core_parser.Parser):
@@ -89,8 +86,8 @@ class Parser(core_parser.Parser):
     # Packet parsing stuff goes here.
 
     # Define what should happen when a packet arrives here
-    def parse(self, data: bytes, proxy: Proxy, origin: ESocketRole) -> list[str]:
-        output = []
+    def parse(self, data: bytes, proxy: Proxy, origin: ESocketRole) -> typing.Sequence[str]:
+        output = None
         # Update packet number
         pktNr = self.getSetting(EBaseSettingKey.PACKET_NUMBER) + 1
         self.setSetting(EBaseSettingKey.PACKET_NUMBER, pktNr)
@@ -129,16 +126,17 @@ class Parser(core_parser.Parser):
             dataLenStr = f'<green><b>{dataLenStr}</b></green>'
 
             # Put it all together.
-            output.append(f'{tsStr} - {proxyStr} {pktNrStr} {directionStr} - {dataLenStr}')
+            output = [f'{tsStr} - {proxyStr} {pktNrStr} {directionStr} - {dataLenStr}']
 
         # Output a hexdump if enabled.
         if self.getSetting(EBaseSettingKey.HEXDUMP_ENABLED):
             hexdumpObj = self.getSetting(EBaseSettingKey.HEXDUMP)
-            for line in hexdumpObj.hexdump(data):
-                output.append(line)
+            if output is None:
+                output = []
+            output.extend(hexdumpObj.hexdump(data))
 
         # Return the output.
-        return output
+        return _NO_OUTPUT if output is None else output
 
     ###############################################################################
     # CLI stuff goes here.
@@ -339,7 +337,6 @@ class Parser(core_parser.Parser):
 
     def _yesNoCompleter(self, bufferStatus: BufferStatus) -> typing.NoReturn:
         options = ['yes', 'no']
-        for option in options:
-            if option.startswith(bufferStatus.being_completed):
-                self.completer.candidates.append(option)
+        prefix = bufferStatus.being_completed
+        self.completer.candidates.extend(option for option in options if option.startswith(prefix))
         return
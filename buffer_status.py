@@ -6,16 +6,28 @@ if typing.TYPE_CHECKING:
 
 
 class BufferStatus():
+    # One is created for every completion, slots keep it small and attribute access cheap.
+    __slots__ = ('_doc', 'origline', 'cursorPos', 'begin', 'end', 'being_completed', '_words', 'wordIdx')
+
     def __init__(self, doc: Document):
         self._doc = doc
 
         # This containes the whole line in the line buffer
-        self.origline           = self._doc.current_line
+        self.origline           = doc.current_line
+
+        self.cursorPos          = doc.cursor_position
+
+        # Completing on an empty line, there is no word to look for.
+        if not self.origline:
+            self.begin = self.end   = self.cursorPos
+            self.being_completed    = ''
+            self._words             = ['']
+            self.wordIdx            = 0
+            return
 
-        self.cursorPos          = self._doc.cursor_position
         # This is the index of the first character in the line buffer that is considered for completion
         # This is the index of the last character in the line buffer that is considered for completion
-        self.begin, self.end    = self._doc.find_boundaries_of_current_word()
+        self.begin, self.end    = doc.find_boundaries_of_current_word()
         self.begin += self.cursorPos
         self.end += self.cursorPos
 
@@ -25,33 +37,25 @@ class BufferStatus():
         # This is the whole word that is being considered for completion
         self.being_completed    = self.origline[self.begin: self.end]
         # being_completed = 'wordth'
-        self.words              = self.origline.split(' ')
+        # The space separated words are only split when a completer asks for them, see words.
+        self._words             = None
 
         # The word index in the line, in the example it's 3.
-        self.wordIdx            = self._getWordIdx()
+        # Words based on spaces, not completion separators. Counting the spaces before the word gives the same index
+        # as splitting the line would.
+        # begin only updates when completion is requested, past the end of the line the index is 0.
+        self.wordIdx            = self.origline.count(' ', 0, self.begin) if self.begin <= len(self.origline) else 0
         return
 
     def __str__(self) -> str:
         return f'{self.origline=}\n{self.begin=}\n{self.end=}\n{self.being_completed=}\n{self.wordIdx=}'
 
+    @property
+    def words(self) -> list[str]:
+        if self._words is None:
+            # A single word needs no split.
+            self._words = self.origline.split(' ') if ' ' in self.origline else [self.origline]
+        return self._words
+
     def getDocument(self) -> Document:
         return self._doc
-
-    def _getWordIdx(self) -> int:
-        # Which word are we currently completing
-        # Words based on spaces, not completion separators
-
-        if self.begin == 0:
-            return 0
-
-        if self.begin > len(self.origline):
-            # begin only updates when completion is requested
-            # return 0 to avoid index error
-            return 0
-
-        wordIdx = 0
-        # Walk backwards through the line and count spaces.
-        for idx in range(self.begin - 1, -1, -1):
-            if self.origline[idx] == ' ':
-                wordIdx += 1
-        return wordIdx
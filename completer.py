@@ -19,13 +19,24 @@ class CustomCompleter(Completer):
         self.parser = parser
 
         self.candidates: list[str] = []        # Functions append strings that would complete the current word here.
+
+        # Buffer status of the last completion, reused while the text and cursor position don't change.
+        self._bufferStatus: BufferStatus = None
+        self._bufferStatusKey: typing.Tuple[str, int] = None
         return
 
+    def _getBufferStatus(self, document: Document) -> BufferStatus:
+        key = (document.text, document.cursor_position)
+        if key != self._bufferStatusKey:
+            self._bufferStatus = BufferStatus(document)
+            self._bufferStatusKey = key
+        return self._bufferStatus
+
     # pylint: disable=unused-argument
     def get_completions(self, document: Document, complete_event: pt.completion.base.CompleteEvent) -> Completion:
         try:
             cmdDict: CommandDictType = self.parser.commandDictionary
-            bufferStatus: BufferStatus = BufferStatus(document)
+            bufferStatus: BufferStatus = self._getBufferStatus(document)
 
             self.candidates = []
 
@@ -38,9 +49,7 @@ class CustomCompleter(Completer):
                 pass
             elif bufferStatus.wordIdx == 0:
                 # Completing commands
-                for cmd in cmdDict:
-                    if cmd.startswith(bufferStatus.being_completed):
-                        self.candidates.append(cmd)
+                self.candidates.extend(self.parser.getCommandsStartingWith(bufferStatus.being_completed))
             else:
                 hasNothing = self._completeCommandArgument(bufferStatus, cmdDict)
                 if hasNothing:
@@ -119,7 +128,7 @@ class CustomCompleter(Completer):
         # For example if completing '!3' but '!30' and '!31' are also available
         # then return only '!3'.
 
-        bufferStatus = BufferStatus(document)
+        bufferStatus = self._getBufferStatus(document)
 
         historyLines = self.application.getHistoryList()
         historyIndexes = list(idx for idx, _ in enumerate(historyLines))
@@ -155,7 +164,10 @@ class CustomCompleter(Completer):
     def getVariableCandidates(self, includePrefix: bool, bufferStatus: BufferStatus) -> typing.NoReturn:
         # TODO: allow for $(varname) format also
         # make sure that $(varname)$(varname) also works.
-        for variableName in self.application.getVariableNames():
-            if (('$' if includePrefix else '') + variableName).startswith(bufferStatus.being_completed):
-                self.candidates.append(('$' if includePrefix else '') + variableName)
+        prefix = '$' if includePrefix else ''
+        self.candidates.extend(
+            prefix + variableName
+            for variableName in self.application.getVariableNames()
+            if (prefix + variableName).startswith(bufferStatus.being_completed)
+        )
         return
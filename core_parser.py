@@ -10,9 +10,19 @@ import typing
 # struct is used to decode bytes into primitive data types
 # https://docs.python.org/3/library/struct.html
 import struct
+import functools
+import bisect
 import os
+import re
+import sys
 from enum import Enum
-from copy import copy
+
+try:
+    import numpy
+    _NUMPY_AVAILABLE = True
+except ImportError:
+    _NUMPY_AVAILABLE = False
+
 # pylint: disable=redefined-builtin
 from prompt_toolkit import print_formatted_text as print
 # pylint: enable=redefined-builtin
@@ -33,32 +43,137 @@ if typing.TYPE_CHECKING:
             typing.Iterable[typing.Callable[[BufferStatus], typing.NoReturn]]  # Completer functions
         ]
     ]
+    CommandSchemaType = dict[
+        str,  # Key (command name)
+        typing.Tuple[  # Value
+            str,  # Name of the command callback method
+            str,  # Help text
+            typing.Optional[typing.Tuple[typing.Optional[str], ...]]  # Names of the completer methods
+        ]
+    ]
+
+
+# Compiled struct objects, so repeated pack and unpack commands don't parse the same format string again.
+@functools.lru_cache(maxsize=128)
+def _getStruct(formatString: str) -> struct.Struct:
+    return struct.Struct(formatString)
+
+
+_BYTE_STRUCT = struct.Struct('=B')
+
+# numpy kinds of the numeric struct data types, used to unpack large payloads in one go.
+_NUMPY_KIND_MAPPING: dict[str, str] = {
+    'b': 'i', 'B': 'u', 'h': 'i', 'H': 'u', 'i': 'i', 'I': 'u', 'l': 'i', 'L': 'u',
+    'q': 'i', 'Q': 'u', 'n': 'i', 'N': 'u', 'P': 'u', 'e': 'f', 'f': 'f', 'd': 'f'
+}
+# numpy byte orders of the struct byte order characters.
+_NUMPY_BYTEORDER_MAPPING: dict[str, str] = {'@': '=', '=': '=', '<': '<', '>': '>', '!': '>'}
+# Below this many bytes struct is just as fast.
+_NUMPY_MIN_BYTES = 4096
+
+
+# Returns the part of a sorted sequence of strings that start with prefix.
+def _prefixMatches(sortedOptions: typing.Sequence[str], prefix: str) -> typing.Sequence[str]:
+    if not prefix:
+        return sortedOptions
+    lo = bisect.bisect_left(sortedOptions, prefix)
+    # Everything starting with prefix sorts before prefix with its last character incremented.
+    # The highest code point can't be incremented, so those are dropped and the character before is incremented.
+    # If only those are left, everything after lo starts with prefix.
+    upperPrefix = prefix.rstrip(chr(sys.maxunicode))
+    if not upperPrefix:
+        return sortedOptions[lo:]
+    hi = bisect.bisect_left(sortedOptions, upperPrefix[:-1] + chr(ord(upperPrefix[-1]) + 1), lo)
+    return sortedOptions[lo:hi]
+
+
+# Number prefixes understood by _strToInt, mapped to the prefix length and the base.
+_INT_PREFIXES: dict[str, tuple[int, int]] = {
+    '0x': (2, 16),
+    '0o': (2, 8),
+    '0b': (2, 2),
+    'x': (1, 16),
+    'o': (1, 8),
+    'b': (1, 2)
+}
+
+# Matches one escape sequence: a hex escape, an octal escape or any other single byte.
+# The group is empty if the data ends with a lone backslash.
+_ESCAPE_RE = re.compile(rb'\\(x.{0,2}|[0-7]{1,3}|.?)', re.DOTALL)
+
+# Replacements of the escape sequences that are a single character, keyed by that character.
+_ESCAPE_MAP: dict[int, bytes] = {
+    ord('\\'): b'\\',
+    ord('n'): b'\n',
+    ord('r'): b'\r',
+    ord('t'): b'\t',
+    ord('b'): b'\b',
+    ord('f'): b'\f',
+    ord('v'): b'\v'
+}
+
+# Finds the definition of the Parser class in the source of a parser module.
+_PARSER_CLASS_RE = re.compile(rb'^\s*class\s+Parser\s*\(', re.MULTILINE)
+
+# Names for the struct byte order and data type characters used by pack and unpack.
+_FORMAT_MAPPING: dict[str, str] = {
+    'native': '@',
+    'standard_size': '=',
+    'little_endian': '<',
+    'big_endian': '>',
+    'network': '!'
+}
+
+_DATATYPE_MAPPING: dict[str, str] = {
+    'byte': 'c',
+    'char': 'b',
+    'uchar': 'B',
+    '_Bool': '?',
+    'short': 'h',
+    'ushort': 'H',
+    'int': 'i',
+    'uint': 'I',
+    'long': 'l',
+    'ulong': 'L',
+    'long_long': 'q',
+    'ulong_long': 'Q',
+    'ssize_t': 'n',
+    'size_t': 'N',
+    'half_float_16bit': 'e',
+    'float': 'f',
+    'double': 'd',
+    'pascal_string': 'p',
+    'c_string': 's',
+    'void_ptr': 'P'
+}
+
+# allow the raw values also
+_FORMAT_MAPPING.update({value: value for value in list(_FORMAT_MAPPING.values())})
+_DATATYPE_MAPPING.update({value: value for value in list(_DATATYPE_MAPPING.values())})
+
+# 'n' and 'N' only available in native.
+_NATIVE_ONLY_KEYS = frozenset(key for key, value in _DATATYPE_MAPPING.items() if value in ('n', 'N'))
 
 ###############################################################################
 # Setting storage stuff goes here.
 
 
 class ECoreSettingKey(Enum):
-    def __eq__(self, other) -> bool:
-        if other is int:
-            return self.value == other
-        if other is str:
-            return self.name == other
-        if repr(type(self)) == repr(type(other)):
-            return self.value == other.value
+    # Keys are compared by the class name instead of the class, because reloading
+    # the module creates a new class while the stored settings still use the old keys.
+    def __eq__(self, other: typing.Any) -> bool:
+        if isinstance(other, Enum) and type(other).__name__ == type(self).__name__:
+            return self._value_ == other._value_
         return False
 
-    def __gt__(self, other) -> bool:
-        if other is int:
-            return self.value > other
-        if other is str:
-            return self.name > other
-        if repr(type(self)) == repr(type(other)):
-            return self.value > other.value
-        raise ValueError('Can not compare.')
+    def __gt__(self, other: typing.Any) -> bool:
+        if isinstance(other, Enum) and type(other).__name__ == type(self).__name__:
+            return self._value_ > other._value_
+        return NotImplemented
 
     def __hash__(self):
-        return self.value.__hash__()
+        # The values are ints, which can be used as the hash directly.
+        return self._value_
 
 
 class Parser():
@@ -68,16 +183,27 @@ class Parser():
     def __init__(self, application: Application, settings: dict[(Enum, typing.Any)]):
         self.application = application
         self.completer = CustomCompleter(application, self)
-        self.commandDictionary: CommandDictType = self._buildCommandDict()
+        self.commandDictionary: CommandDictType = self._getCommandDict()
+        # Sorted names for prefix lookups when completing.
+        self._sortedCommands: tuple[str, ...] = tuple(sorted(self.commandDictionary))
+
+        # The setting keys don't change at runtime, they are collected once when first needed.
+        self._settingKeySetCache: typing.Optional[frozenset[Enum]] = None
+        self._settingNamesCache: typing.Optional[tuple[str, ...]] = None
 
         # Populate settings
         self.settings = settings
         # If a setting is not set, it shall be set now
+        defaultSettings = None
         for settingKey in self.getSettingKeys():
             if settingKey not in self.settings:
-                self.settings[settingKey] = self.getDefaultSettings()[settingKey]
+                if defaultSettings is None:
+                    # Only built once, and only if any setting is missing.
+                    defaultSettings = self.getDefaultSettings()
+                self.settings[settingKey] = defaultSettings[settingKey]
         # Remove any settings that are no longer in the list
-        keysToRemove = list(filter(lambda settingKey: settingKey not in self.getSettingKeys(), self.settings.keys()))
+        settingKeySet = self._getSettingKeySet()
+        keysToRemove = [settingKey for settingKey in self.settings.keys() if settingKey not in settingKeySet]
         for settingKey in keysToRemove:
             self.settings.pop(settingKey)
 
@@ -88,8 +214,20 @@ class Parser():
         return {
         }
 
+    # Returns the setting keys as a set for membership tests.
+    def _getSettingKeySet(self) -> frozenset[Enum]:
+        if self._settingKeySetCache is None:
+            self._settingKeySetCache = frozenset(self.getSettingKeys())
+        return self._settingKeySetCache
+
+    # Returns the sorted names of the setting keys for prefix lookups when completing.
+    def _getSettingNames(self) -> tuple[str, ...]:
+        if self._settingNamesCache is None:
+            self._settingNamesCache = tuple(sorted(x.name for x in self.getSettingKeys()))
+        return self._settingNamesCache
+
     def getSetting(self, settingKey: Enum) -> typing.Any:
-        if settingKey not in self.getSettingKeys():
+        if settingKey not in self._getSettingKeySet():
             raise IndexError(f'Setting Key {settingKey} was not found.')
         settingValue = self.settings.get(settingKey, None)
         if settingValue is None:
@@ -99,7 +237,7 @@ class Parser():
         return settingValue
 
     def setSetting(self, settingKey: Enum, settingValue: typing.Any) -> typing.NoReturn:
-        if settingKey not in self.getSettingKeys():
+        if settingKey not in self._getSettingKeySet():
             raise IndexError(f'Setting Key {settingKey} was not found.')
         self.settings[settingKey] = settingValue
         return
@@ -107,6 +245,54 @@ class Parser():
     ###############################################################################
     # CLI stuff goes here.
 
+    # Returns the command dictionary, bound to this parser.
+    def _getCommandDict(self) -> CommandDictType:
+        parserClass = type(self)
+        # Look only in the class itself, a subclass with different commands must not use the schema of its base.
+        schema: typing.Optional[CommandSchemaType] = parserClass.__dict__.get('_commandSchema', None)
+        if schema is None:
+            commandDictionary = self._buildCommandDict()
+            # False marks classes that can't be cached, because not all commands are methods of the parser.
+            setattr(parserClass, '_commandSchema', self._toCommandSchema(commandDictionary) or False)
+            return commandDictionary
+        if schema is False:
+            return self._buildCommandDict()
+
+        return {
+            command: (
+                getattr(self, functionName),
+                helpText,
+                None if completerNames is None else [
+                    None if completerName is None else getattr(self, completerName)
+                    for completerName in completerNames
+                ]
+            )
+            for command, (functionName, helpText, completerNames) in schema.items()
+        }
+
+    # Replaces the bound methods in the command dictionary with their names.
+    def _toCommandSchema(self, commandDictionary: CommandDictType) -> typing.Optional[CommandSchemaType]:
+        def methodName(method: typing.Callable) -> typing.Optional[str]:
+            if getattr(method, '__self__', None) is not self:
+                return None
+            return method.__name__
+
+        schema = {}
+        for command, (function, helpText, completers) in commandDictionary.items():
+            functionName = methodName(function)
+            if functionName is None:
+                return None
+            completerNames = None
+            if completers is not None:
+                completerNames = tuple(None if completer is None else methodName(completer) for completer in completers)
+                if any(
+                    completerName is None and completer is not None
+                    for completerName, completer in zip(completerNames, completers)
+                ):
+                    return None
+            schema[command] = (functionName, helpText, completerNames)
+        return schema
+
     # Define your custom commands here. Each command requires those arguments:
     # 1. args: list[str]
     #   A list of command arguments. args[0] is always the command string itself.
@@ -120,6 +306,8 @@ class Parser():
     # The last completer in the completer array will be used for all words if
     # the word index is higher than the index in the completer array.
     # If you don't want to provide more completions, use None at the end.
+    # The dictionary is built once per parser class and then reused with the method names of the commands,
+    # so it should not depend on the state of the parser. Reloading the parser module builds it again.
     def _buildCommandDict(self) -> CommandDictType:
         proxySelectionNote = 'Note: Proxy may be selected by ID, LocalPort or it\'s name.'\
                              'The ID has preference over LocalPort.'
@@ -586,7 +774,7 @@ class Parser():
             if len(args[1]) == 0:
                 print(self.getHelpText(args[0]))
                 return 'Syntax error'
-            if not args[1] in [x.name for x in self.getSettingKeys()]:
+            if not args[1] in self._getSettingNames():
                 return f'{args[1]} is not a valid setting.'
 
             settingKey = None
@@ -768,7 +956,7 @@ class Parser():
             data = self._aux_pack_convert(dataTypeMapping[dataTypeMappingString], dataStr)
             convertedData.append(data)
         try:
-            packedValues = struct.pack(formatString, *convertedData)
+            packedValues = _getStruct(formatString).pack(*convertedData)
         except struct.error as e:
             return f'Unable to pack {convertedData} with format {formatString}: {e}'
 
@@ -801,26 +989,50 @@ class Parser():
         ):
             return f'format for data type {dataTypeMappingString} must be native (@).'
 
-        hexDataStr = ''.join(args[3:])  # Joining on '' eliminates spaces.
-        byteArray = bytes.fromhex(hexDataStr)
+        byteArray = self._aux_unpack_hexToBytes(args[3:])
 
         # calculate how many values we have
-        dataTypeSize = struct.calcsize(f'{formatMapping[formatMappingString]}{dataTypeMapping[dataTypeMappingString]}')
+        dataTypeSize = _getStruct(f'{formatMapping[formatMappingString]}{dataTypeMapping[dataTypeMappingString]}').size
         if len(byteArray) % dataTypeSize != 0:
             return f'Expecting a multiple of {dataTypeSize} Bytes,' \
-                   f'which is the size of type {dataTypeMappingString}, but got {len(byteArray)} Bytes in {byteArray}'
-        dataCount = int(len(byteArray) / dataTypeSize)
+                   f'which is the size of type {dataTypeMappingString}, but got {len(byteArray)} Bytes in {bytes(byteArray)}'
+        dataCount = len(byteArray) // dataTypeSize
 
         formatString = f'{formatMapping[formatMappingString]}{dataCount}{dataTypeMapping[dataTypeMappingString]}'
 
+        numpyKind = _NUMPY_KIND_MAPPING.get(dataTypeMapping[dataTypeMappingString], None)
+        if _NUMPY_AVAILABLE and numpyKind is not None and len(byteArray) >= _NUMPY_MIN_BYTES:
+            # Reinterpret the buffer as an array instead of creating a python object per value in struct.
+            # Arrays of a single type have no padding, so native alignment doesn't matter here.
+            dtype = f'{_NUMPY_BYTEORDER_MAPPING[formatMapping[formatMappingString]]}{numpyKind}{dataTypeSize}'
+            unpackedValues = tuple(numpy.frombuffer(byteArray, dtype=dtype).tolist())
+            print(f'Unpacked: {unpackedValues}')
+            return 0
+
         try:
-            unpackedValues = struct.unpack(formatString, byteArray)
+            unpackedValues = _getStruct(formatString).unpack_from(byteArray)
         except struct.error as e:
-            return f'Unable to unpack {byteArray} with format {formatString}: {e}'
+            return f'Unable to unpack {bytes(byteArray)} with format {formatString}: {e}'
 
         print(f'Unpacked: {unpackedValues}')
         return 0
 
+    # Decodes the hex arguments of unpack directly into one buffer, without joining them into one big string first.
+    def _aux_unpack_hexToBytes(self, hexDataStrArray: list[str]) -> bytearray:
+        if any(len(hexDataStr) % 2 != 0 for hexDataStr in hexDataStrArray):
+            # A byte may be split across arguments, only joining them gives the correct result.
+            return bytearray.fromhex(''.join(hexDataStrArray))  # Joining on '' eliminates spaces.
+
+        byteArray = bytearray(sum(len(hexDataStr) for hexDataStr in hexDataStrArray) // 2)
+        offset = 0
+        for hexDataStr in hexDataStrArray:
+            chunk = bytes.fromhex(hexDataStr)
+            byteArray[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+        # Whitespace inside of arguments is ignored by fromhex, so there may be some space left.
+        del byteArray[offset:]
+        return byteArray
+
     # Converts the string data from the user's input into the correct data type for struct.pack
     def _aux_pack_convert(self, dataTypeString: str, dataStr: str) -> typing.Union[bytes, int, float]:
         if dataTypeString in ['c', 's', 'p']:
@@ -835,51 +1047,10 @@ class Parser():
         raise ValueError(f'Format string {dataTypeString} unknown.')
 
     def _aux_pack_getFormatMapping(self) -> dict[str, str]:
-        mapping = {
-            'native': '@',
-            'standard_size': '=',
-            'little_endian': '<',
-            'big_endian': '>',
-            'network': '!'
-        }
-
-        # allow the raw input also
-        values = copy(mapping).values()
-        for value in values:
-            mapping[value] = value
-
-        return mapping
+        return _FORMAT_MAPPING
 
     def _aux_pack_getDataTypeMapping(self) -> dict[str, str]:
-        mapping = {
-            'byte': 'c',
-            'char': 'b',
-            'uchar': 'B',
-            '_Bool': '?',
-            'short': 'h',
-            'ushort': 'H',
-            'int': 'i',
-            'uint': 'I',
-            'long': 'l',
-            'ulong': 'L',
-            'long_long': 'q',
-            'ulong_long': 'Q',
-            'ssize_t': 'n',
-            'size_t': 'N',
-            'half_float_16bit': 'e',
-            'float': 'f',
-            'double': 'd',
-            'pascal_string': 'p',
-            'c_string': 's',
-            'void_ptr': 'P'
-        }
-
-        # allow the raw values also
-        values = copy(mapping).values()
-        for value in values:
-            mapping[value] = value
-
-        return mapping
+        return _DATATYPE_MAPPING
 
     def _cmd_convert(self, args: list[str], _) -> typing.Union[int, str]:
         if len(args) not in [2, 3]:
@@ -908,11 +1079,11 @@ class Parser():
             numberString = args[1]
             number = self._strToInt(numberString)
 
-        # Also get a byte array out of it.
-        hexString = f'{number:2X}'
-        if len(hexString) % 2 == 1:
-            hexString = '0' + hexString
-        byteArray = bytes.fromhex(hexString)
+        # Also get a byte array out of it. Negative numbers are shown in two's complement.
+        if number < 0:
+            byteArray = number.to_bytes(((~number).bit_length() + 8) // 8, 'big', signed=True)
+        else:
+            byteArray = number.to_bytes(max(1, (number.bit_length() + 7) // 8), 'big')
 
         # print the number
         print(f'DEC: {number}\nHEX: {hex(number)}\nOCT: {oct(number)}\nBIN: {bin(number)}\nBytes: {byteArray}')
@@ -923,25 +1094,20 @@ class Parser():
 
     def _convertTypeCompleter(self, bufferStatus: BufferStatus) -> typing.NoReturn:
         options = ['dec', 'bin', 'oct', 'hex']
-        for option in options:
-            if option.startswith(bufferStatus.being_completed):
-                self.completer.candidates.append(option)
+        prefix = bufferStatus.being_completed
+        self.completer.candidates.extend(option for option in options if option.startswith(prefix))
         return
 
     def _packDataTypeCompleter(self, bufferStatus: BufferStatus) -> typing.NoReturn:
         options = self._aux_pack_getDataTypeMapping().keys()
-        for option in options:
-            if option.startswith(bufferStatus.being_completed):
-                self.completer.candidates.append(option)
+        prefix = bufferStatus.being_completed
+        self.completer.candidates.extend(option for option in options if option.startswith(prefix))
         return
 
     def _packFormatCompleter(self, bufferStatus: BufferStatus) -> typing.NoReturn:
         formatMapping = self._aux_pack_getFormatMapping()
-        dataTypeMapping = self._aux_pack_getDataTypeMapping()
-        # 'n' and 'N' only available in native.
-        nativeOnlyList = list(filter(lambda x: dataTypeMapping[x] in ['n', 'N'], dataTypeMapping.keys()))
 
-        if bufferStatus.words[1] in nativeOnlyList:
+        if bufferStatus.words[1] in _NATIVE_ONLY_KEYS:
             self.completer.candidates.append('native')
             # '@' also valid, but omit for quicker typing.
             # self.completer.candidates.append('@')
@@ -949,17 +1115,12 @@ class Parser():
 
         # Return all available options
         options = formatMapping.keys()
-        for option in options:
-            if option.startswith(bufferStatus.being_completed):
-                self.completer.candidates.append(option)
+        prefix = bufferStatus.being_completed
+        self.completer.candidates.extend(option for option in options if option.startswith(prefix))
         return
 
     def _commandCompleter(self, bufferStatus: BufferStatus) -> typing.NoReturn:
-        self.completer.candidates.extend([
-            s
-            for s in self.commandDictionary
-            if s and s.startswith(bufferStatus.being_completed)
-        ])
+        self.completer.candidates.extend(self.getCommandsStartingWith(bufferStatus.being_completed))
         return
 
     def _fileCompleter(self, bufferStatus: BufferStatus) -> typing.NoReturn:
@@ -985,20 +1146,21 @@ class Parser():
                 filenameStart = word
 
         # Find all files and directories in that directory
-        if os.path.isdir(directory):
-            files = os.listdir(directory)
-            # Find which of those files matches the end of the path
-            for file in files:
-                if os.path.isdir(os.path.join(directory, file)):
-                    file += '/'
-                if file.startswith(filenameStart):
-                    self.completer.candidates.append(file)
+        try:
+            with os.scandir(directory) as dirEntries:
+                # Find which of those files matches the end of the path
+                self.completer.candidates.extend(
+                    dirEntry.name + ('/' if dirEntry.is_dir() else '')
+                    for dirEntry in dirEntries
+                    if dirEntry.name.startswith(filenameStart)
+                )
+        except OSError:
+            # Directory doesn't exist or can't be read.
+            pass
         return
 
     def _settingsCompleter(self, bufferStatus: BufferStatus) -> typing.NoReturn:
-        for settingName in [x.name for x in self.getSettingKeys()]:
-            if settingName.startswith(bufferStatus.being_completed):
-                self.completer.candidates.append(settingName)
+        self.completer.candidates.extend(_prefixMatches(self._getSettingNames(), bufferStatus.being_completed))
         return
 
     def _variableCompleter(self, bufferStatus: BufferStatus) -> typing.NoReturn:
@@ -1006,29 +1168,25 @@ class Parser():
         return
 
     def _proxyNameCompleter(self, bufferStatus: BufferStatus) -> typing.NoReturn:
+        localPorts, names = self.application.getProxyIndex()
         # Find listening port numbers only if we started with a number.
         if (
                 len(bufferStatus.being_completed) > 0 and
                 ord(bufferStatus.being_completed[0]) in range(ord('0'), ord('9') + 1)
         ):
-            for proxy in self.application.getProxyList():
-                _, lp = proxy.getBind()
-                if str(lp).startswith(bufferStatus.being_completed):
-                    self.completer.candidates.append(str(lp))
+            self.completer.candidates.extend(_prefixMatches(localPorts, bufferStatus.being_completed))
             return
 
         # Find Names otherwise. (Names can't start with a number)
-        for proxy in self.application.getProxyList():
-            if proxy.name.startswith(bufferStatus.being_completed):
-                self.completer.candidates.append(proxy.name)
+        self.completer.candidates.extend(_prefixMatches(names, bufferStatus.being_completed))
         return
 
     def _parserNameCompleter(self, bufferStatus: BufferStatus) -> typing.NoReturn:
         FILE_SIZE_LIMIT_FOR_CHECK = 50 * (2 ** 10)  # 50 KiB
         # find all files in directory
-        for fileName in os.listdir(os.curdir):
-            isCandidate = False
-            try:
+        with os.scandir(os.curdir) as dirEntries:
+            for dirEntry in dirEntries:
+                fileName = dirEntry.name
                 if not fileName.startswith(bufferStatus.being_completed):
                     # Skip filenames that don't match.
                     continue
@@ -1037,33 +1195,19 @@ class Parser():
                     # Skip non python modules
                     continue
 
-                if os.path.getsize(fileName) > FILE_SIZE_LIMIT_FOR_CHECK:
-                    # Skip files that are too large to check
-                    continue
-
-                with open(fileName, 'rt', encoding='utf-8') as file:
-                    # Find the 'class Parser(' string in the file
-                    # Need to do it in steps because there may be any number of whitespaces
-                    while line := file.readline():
-                        line = line.strip()
-                        if not line.startswith('class'):
-                            continue
-                        line = line[len('class'):].strip()
-                        if not line.startswith('Parser'):
-                            continue
-                        line = line[len('Parser'):].strip()
-                        if not line.startswith('('):
-                            continue
-                        isCandidate = True
-                        break
-            except (IOError, PermissionError, IsADirectoryError):
-                continue
+                try:
+                    if not dirEntry.is_file() or dirEntry.stat().st_size > FILE_SIZE_LIMIT_FOR_CHECK:
+                        # Skip directories and files that are too large to check
+                        continue
 
-            if not isCandidate:
-                # Check next file
-                continue
+                    with open(dirEntry.path, 'rb') as file:
+                        # Find the 'class Parser(' string in the file
+                        isCandidate = _PARSER_CLASS_RE.search(file.read()) is not None
+                except OSError:
+                    continue
 
-            self.completer.candidates.append(fileName[:-3])
+                if isCandidate:
+                    self.completer.candidates.append(fileName[:-3])
         return
 
     ###############################################################################
@@ -1074,18 +1218,23 @@ class Parser():
 
     # This function take the command line string and calls the relevant python function with the correct arguments.
     def handleUserInput(self, userInput: str, proxy: Proxy) -> typing.Union[int, str]:
-        args = userInput.split(' ')
-
-        if len(userInput.strip()) == 0:
+        if not userInput or userInput.isspace():
             # Ignore empty commands
             return 0
 
+        # Split on single spaces on purpose, commands like s2s rely on repeated spaces being kept.
+        args = userInput.split(' ')
+
         if args[0] not in self.commandDictionary:
             return f'Undefined command: {repr(args[0])}'
 
         function, _, _ = self.commandDictionary[args[0]]
         return function(args, proxy)
 
+    # Returns the names of all commands that start with prefix, sorted alphabetically.
+    def getCommandsStartingWith(self, prefix: str) -> typing.Sequence[str]:
+        return _prefixMatches(self._sortedCommands, prefix)
+
     def getHelpText(self, cmdString: str) -> str:
         _, helpText, _ = self.commandDictionary[cmdString]
         try:
@@ -1094,76 +1243,46 @@ class Parser():
             print(f'Unable to format helptext {repr(helpText)}: {e}')
             return helpText
 
-    def _simpleEscape(self, nextByte: bytes) -> bytes:
-        ret = b''
-        if nextByte == b'\\':
-            ret = b'\\'
-        elif nextByte == b'n':
-            ret = b'\n'
-        elif nextByte == b'r':
-            ret = b'\r'
-        elif nextByte == b't':
-            ret = b'\t'
-        elif nextByte == b'b':
-            ret = b'\b'
-        elif nextByte == b'f':
-            ret = b'\f'
-        elif nextByte == b'v':
-            ret = b'\v'
-        elif nextByte == b'0':
-            ret = b'\0'
-        return ret
-
     # replaces escape sequences with the proper values
     def _escape(self, data: bytes) -> bytes:
-        idx = 0
-        newData = b''
-        while idx < len(data):
-            b = self._intToByte(data[idx])
-            if b == b'\\':
-                idx += 1  # Add one to the index so we don't read the escape sequence byte as a normal byte.
-                nextByte = self._intToByte(data[idx])  # May throw IndexError, pass it up to the user.
-                appendedByte = self._simpleEscape(nextByte)
-                if appendedByte != b'':
-                    newData += appendedByte
-                elif nextByte == b'x':
-                    newData += bytes.fromhex(data[idx + 1:idx + 3].decode())
-                    idx += 2  # skip 2 more bytes.
-                elif ord(nextByte) in range(ord(b'0'), ord(b'7') + 1):
-                    octalBytes = data[idx:idx + 3]
-                    num = int(octalBytes, 7)
-                    newData += self._intToByte(num)
-                    idx += 2  # skip 2 more bytes
-
-                elif nextByte == b'u':
-                    raise Exception('\\uxxxx is not supported')
-                elif nextByte == b'U':
-                    raise Exception('\\Uxxxxxxxx is not supported')
-                elif nextByte == b'N':
-                    raise Exception('\\N{Name} is not supported')
-                else:
-                    raise ValueError(f'Invalid escape sequence at index {idx} in {data}: \\{repr(nextByte)[2:-1]}')
-            else:
-                # No escape sequence. Just add the byte as is
-                newData += b
-            idx += 1
-        return newData
+        return _ESCAPE_RE.sub(self._escapeSequence, data)
+
+    # Returns the replacement for a single escape sequence matched by _ESCAPE_RE.
+    def _escapeSequence(self, match: re.Match) -> bytes:
+        idx = match.start(1)
+        sequence = match.group(1)
+        if len(sequence) == 0:
+            raise IndexError(f'Incomplete escape sequence at index {idx} in {match.string}')
+
+        replacement = _ESCAPE_MAP.get(sequence[0], None)
+        if replacement is not None:
+            return replacement
+        if sequence.startswith(b'x'):
+            return bytes.fromhex(sequence[1:].decode())
+        if ord(b'0') <= sequence[0] <= ord(b'7'):
+            value = int(sequence, 8)
+            if value > 0o377:
+                raise ValueError(f'Octal escape sequence out of range at index {idx} in {match.string}: '
+                                 f'\\{repr(sequence)[2:-1]}')
+            return self._intToByte(value)
+
+        if sequence == b'u':
+            raise Exception('\\uxxxx is not supported')
+        if sequence == b'U':
+            raise Exception('\\Uxxxxxxxx is not supported')
+        if sequence == b'N':
+            raise Exception('\\N{Name} is not supported')
+        raise ValueError(f'Invalid escape sequence at index {idx} in {match.string}: \\{repr(sequence)[2:-1]}')
 
     def _intToByte(self, i: int) -> bytes:
-        return struct.pack('=B', i)
+        return _BYTE_STRUCT.pack(i)
 
     def _strToInt(self, dataStr: str) -> int:
-        if dataStr.startswith('0x'):
-            return int(dataStr[2:], 16)
-        if dataStr.startswith('x'):
-            return int(dataStr[1:], 16)
-        if dataStr.startswith('0o'):
-            return int(dataStr[2:], 8)
-        if (dataStr.startswith('0') and len(dataStr) > 1) or dataStr.startswith('o'):
+        prefix = _INT_PREFIXES.get(dataStr[:2], None) or _INT_PREFIXES.get(dataStr[:1], None)
+        if prefix is not None:
+            prefixLength, base = prefix
+            return int(dataStr[prefixLength:], base)
+        if dataStr.startswith('0') and len(dataStr) > 1:
             return int(dataStr[1:], 8)
-        if dataStr.startswith('0b'):
-            return int(dataStr[2:], 2)
-        if dataStr.startswith('b'):
-            return int(dataStr[1:], 2)
 
         return int(dataStr, 10)
@@ -5,8 +5,15 @@
 import importlib
 import importlib.util
 import hashlib
+import os
 import typing
 
+try:
+    import xxhash
+    _XXHASH_AVAILABLE = True
+except ImportError:
+    _XXHASH_AVAILABLE = False
+
 from types import ModuleType  # Needs to be outside of typing.TYPE_CHECKING for some reason.
 if typing.TYPE_CHECKING:
     pass
@@ -16,6 +23,8 @@ class DynamicLoader:
     def __init__(self, moduleName: str):
         self.moduleName = moduleName
         self.originHash: bytes = None
+        # Modification time, size and inode of the file when originHash was calculated.
+        self._statKey: typing.Tuple[int, int, int] = None
         self.moduleSpec = None
         self.module = None
 
@@ -29,9 +38,16 @@ class DynamicLoader:
         if self.moduleSpec.origin != newModuleSpec.origin:
             return True
 
+        # Only hash the file again if it has been touched since it was last hashed.
+        statKey = self._getStatKey()
+        if statKey == self._statKey:
+            return False
+
         if self.originHash != self.calculateFileHash():
             return True
 
+        # Touched, but the content is still the same.
+        self._statKey = statKey
         return False
 
     def __str__(self) -> str:
@@ -45,19 +61,26 @@ class DynamicLoader:
         if self.moduleSpec is None:
             raise ImportError(f'Module {self.moduleName} not found.')
         self.module = importlib.import_module(self.moduleSpec.name)
+        self._statKey = self._getStatKey()
         self.originHash = self.calculateFileHash()
         return
 
     def reloadModule(self) -> typing.NoReturn:
         # print(f'Reload called on {self.moduleSpec}')
         importlib.reload(self.module)
+        self._statKey = self._getStatKey()
         self.originHash = self.calculateFileHash()
         return
 
+    def _getStatKey(self) -> typing.Tuple[int, int, int]:
+        fileStat = os.stat(self.moduleSpec.origin)
+        return (fileStat.st_mtime_ns, fileStat.st_size, fileStat.st_ino)
+
     def calculateFileHash(self) -> bytes:
-        BUFF_SIZE = 4096
+        # The hash is only used to detect changes, so it doesn't need to be a cryptographic one.
+        # Module sources are small enough to be hashed in one go.
         with open(self.moduleSpec.origin, 'rb') as file:
-            hashFunction = hashlib.md5()
-            while buf := file.read(BUFF_SIZE):
-                hashFunction.update(buf)
-            return hashFunction.digest()
+            content = file.read()
+        if _XXHASH_AVAILABLE:
+            return xxhash.xxh3_64(content).digest()
+        return hashlib.blake2b(content, digest_size=16).digest()
@@ -1,28 +1,7 @@
-from enum import Enum, auto
-import typing
+from enum import IntEnum, auto
 
 
-class ESocketRole(Enum):
+# IntEnum compares and hashes as a plain int, which is cheap on the packet path.
+class ESocketRole(IntEnum):
     SERVER = auto()
     CLIENT = auto()
-
-    def __eq__(self, other: typing.Any) -> bool:
-        if other is int:
-            return self.value == other
-        if other is str:
-            return self.name == other
-        if repr(type(self)) == repr(type(other)):
-            return self.value == other.value
-        return False
-
-    def __gt__(self, other: typing.Any) -> bool:
-        if other is int:
-            return self.value > other
-        if other is str:
-            return self.name > other
-        if repr(type(self)) == repr(type(other)):
-            return self.value > other.value
-        raise ValueError('Can not compare.')
-
-    def __hash__(self):
-        return hash(self.value)
@@ -25,6 +25,7 @@
 
 from __future__ import annotations
 import typing
+import re
 
 from enum import Enum, auto
 
@@ -64,27 +65,42 @@ if typing.TYPE_CHECKING:
 
 class ESettingKey(Enum):
     EXAMPLE_SETTING = auto()
+    # How many bytes at the start of a packet are searched for the drop word, see Parser._DROP_WINDOW.
+    DROP_WINDOW     = auto()
 
+    # Compared and hashed the same way as core_parser.ECoreSettingKey, see there for why.
     def __eq__(self, other: typing.Any) -> bool:
-        if other is int:
-            return self.value == other
-        if other is str:
-            return self.name == other
-        if repr(type(self)) == repr(type(other)):
-            return self.value == other.value
+        if isinstance(other, Enum) and type(other).__name__ == type(self).__name__:
+            return self._value_ == other._value_
         return False
 
     def __gt__(self, other: typing.Any) -> bool:
-        if other is int:
-            return self.value > other
-        if other is str:
-            return self.name > other
-        if repr(type(self)) == repr(type(other)):
-            return self.value > other.value
-        raise ValueError('Can not compare.')
+        if isinstance(other, Enum) and type(other).__name__ == type(self).__name__:
+            return self._value_ > other._value_
+        return NotImplemented
 
     def __hash__(self):
-        return self.value.__hash__()
+        return self._value_
+
+
+# Packets containing _DROP_WORD are dropped, _DING_WORD is replaced with _DONG_WORD in all others.
+# Those are evaluated once each time the module is loaded, so changes are picked up by the reload.
+_DROP_WORD = b'drop'
+_DING_WORD = b'ding'
+_DONG_WORD = b'dong'
+# Finds the words that the parser reacts to. Group 1 is the drop word, group 2 is the ding word.
+_SCAN_PATTERN = re.compile(b'(' + re.escape(_DROP_WORD) + b')|(' + re.escape(_DING_WORD) + b')')
+# Finds only the ding word, for when the drop word is searched separately.
+_DING_PATTERN = re.compile(re.escape(_DING_WORD))
+# Packets shorter than this can't contain any of the words.
+_WORD_LENGTH = min(len(_DROP_WORD), len(_DING_WORD))
+
+# Transformations for the example command, sorted for the completer.
+_EXAMPLE_OPTIONS = ('as_is', 'lower', 'upper')
+# Largest payload the example command sends in total.
+_EXAMPLE_MAX_BYTES = 64 * 1024 * 1024
+# Largest payload the example command hands to the proxy in one call.
+_EXAMPLE_CHUNK_BYTES = 64 * 1024
 
 
 # Class name must be Parser
@@ -94,37 +110,70 @@ class Parser(base_parser.Parser):
     def __str__(self) -> str:
         return 'Example'
 
+    # If the protocol only allows the drop word near the start of a packet, set this to how many bytes to search.
+    # 0 searches the whole packet. Subclasses can override this, it is the default for the DROP_WINDOW setting.
+    _DROP_WINDOW = 0
+
     # Use this to set sensible defaults for your stored variables.
+    # The dictionary is shared by all instances, so only use immutable values here.
+    # Create mutable defaults, such as a Hexdump, in getDefaultSettings instead.
+    _USER_DEFAULT_SETTINGS: dict[(Enum, typing.Any)] = {
+        ESettingKey.EXAMPLE_SETTING: 'ExAmPlE'
+    }
+
     def getDefaultSettings(self) -> dict[(Enum, typing.Any)]:
-        userDefaultSettings = {
-            ESettingKey.EXAMPLE_SETTING: 'ExAmPlE'
+        # Make sure to include the base class settings as well.
+        return super().getDefaultSettings() | self._USER_DEFAULT_SETTINGS | {
+            ESettingKey.DROP_WINDOW: self._DROP_WINDOW
         }
 
-        # Make sure to include the base class settings as well.
-        defaultSettings = super().getDefaultSettings()
-        return defaultSettings | userDefaultSettings
+    # Use this to react to changed settings.
+    def setSetting(self, settingKey: Enum, settingValue: typing.Any) -> typing.NoReturn:
+        super().setSetting(settingKey, settingValue)
+        if settingKey == ESettingKey.EXAMPLE_SETTING:
+            # Encoded again the next time it is needed.
+            self._exampleBytes = None
+        elif settingKey == ESettingKey.DROP_WINDOW:
+            # Read on every packet, so it is kept in an attribute instead of looking up the setting.
+            self._dropWindow = settingValue
+        return
 
     ###############################################################################
     # Packet parsing stuff goes here.
 
     # Define what should happen when a packet arrives here
-    # Do not print here, instead append any console output you want to the output array, one line per entry.
-    def parse(self, data: bytes, proxy: Proxy, origin: ESocketRole) -> list[str]:
+    # Do not print here, instead return any console output you want, one line per entry.
+    # The output of the base class may be shared, build a new list from it to add lines.
+    def parse(self, data: bytes, proxy: Proxy, origin: ESocketRole) -> typing.Sequence[str]:
         output = super().parse(data, proxy, origin)
 
-        # A construct like this may be used to drop packets.
-        if data.find(b'drop') >= 0:
-            output.append('Dropped')
-            return output
+        # Find everything interesting in the data with a single scan.
+        # The memoryview lets the scan work on the data without copying any of it.
+        dingOffsets = []
+        # Packets shorter than the words can't contain them, skip the scan for those.
+        if len(data) >= _WORD_LENGTH:
+            if self._dropWindow > 0:
+                # Only the start of the packet needs to be searched for the drop word.
+                if data.find(_DROP_WORD, 0, self._dropWindow) >= 0:
+                    return [*output, 'Dropped']
+                dingOffsets = [match.start() for match in _DING_PATTERN.finditer(memoryview(data))]
+            else:
+                for match in _SCAN_PATTERN.finditer(memoryview(data)):
+                    # A construct like this may be used to drop packets.
+                    if match.lastindex == 1:
+                        return [*output, 'Dropped']
+                    dingOffsets.append(match.start())
 
         # Do interesting stuff with the data here.
-        data = data.replace(b'ding', b'dong')
+        if dingOffsets:
+            # Both words have the same length, so only the matches need to be overwritten.
+            patchedData = bytearray(data)
+            for offset in dingOffsets:
+                patchedData[offset:offset + len(_DING_WORD)] = _DONG_WORD
+            data = patchedData
 
         # By default, send the data to the client/server.
-        if origin == ESocketRole.CLIENT:
-            proxy.sendToServer(data)
-        else:
-            proxy.sendToClient(data)
+        proxy.forward(origin, data)
         return output
 
     ###############################################################################
@@ -143,6 +192,9 @@ class Parser(base_parser.Parser):
     # The last completer in the completer array will be used for all words if
     # the word index is higher than the index in the completer array.
     # If you don't want to provide more completions, use None at the end.
+    # This is only called for the first instance of the class, later instances reuse its result.
+    # Reloading the module creates a new class, so changes here are still picked up.
+    # See _getCommandDict in core_parser.py
     def _buildCommandDict(self) -> CommandDictType:
         ret = super()._buildCommandDict()
 
@@ -168,30 +220,55 @@ class Parser(base_parser.Parser):
             print(self.getHelpText(args[0]))
             return 'Syntax error.'
 
-        dataStr = str(self.getSetting(ESettingKey.EXAMPLE_SETTING))
-
-        if args[1] == 'upper':
-            dataStr = dataStr.upper()
-        elif args[1] == 'lower':
-            dataStr = dataStr.lower()
-        elif args[1] == 'as_is':
-            pass
-        else:
-            print(self.getHelpText(args[0]))
-            return f'Capitalize must be "upper", "lower" or "as_is", but was {args[1]}'
-
-        count = self._strToInt(args[2])  # this allows hex, bin and oct notations also
-        data = dataStr.encode('utf-8')
-
-        # xmit count times
+        command, transformation, countStr = args
+        data = self._getExampleBytes().get(transformation, None)
+        if data is None:
+            print(self.getHelpText(command))
+            return f'Capitalize must be "upper", "lower" or "as_is", but was {transformation}'
+
+        try:
+            count = self._strToInt(countStr)  # this allows hex, bin and oct notations also
+        except ValueError:
+            return f'Count must be a number, but was {countStr}'
+        if count < 0:
+            return f'Count must not be negative, but was {count}'
+        # Don't try to allocate huge payloads because of a typo.
+        if len(data) * count > _EXAMPLE_MAX_BYTES:
+            return f'Sending {len(data)} Bytes {count} times exceeds the limit of {_EXAMPLE_MAX_BYTES} Bytes'
+
+        # Check the connection before the payload is built.
         if not proxy.getIsConnected():
             return 'Not connected'
 
-        for _ in range(0, count):
-            proxy.sendToClient(data)
+        if count == 0 or len(data) == 0:
+            return 0
+        # xmit count times
+        # Send whole repetitions in chunks of up to _EXAMPLE_CHUNK_BYTES instead of calling into the proxy count times.
+        # Repeating bytes copies by doubling inside of CPython already.
+        # The connection was checked above, from here on the burst is best effort.
+        sendToClient = proxy.sendToClient
+        repetitionsPerChunk = max(1, _EXAMPLE_CHUNK_BYTES // len(data))
+        chunkCount, remainder = divmod(count, repetitionsPerChunk)
+        if chunkCount > 0:
+            chunk = data * repetitionsPerChunk
+            for _ in range(chunkCount):
+                sendToClient(chunk)
+        if remainder > 0:
+            sendToClient(data * remainder)
 
         return 0
 
+    # Returns the example setting encoded for each transformation of the example command.
+    def _getExampleBytes(self) -> dict[str, bytes]:
+        if self._exampleBytes is None:
+            dataStr = str(self.getSetting(ESettingKey.EXAMPLE_SETTING))
+            self._exampleBytes = {
+                'upper': dataStr.upper().encode('utf-8'),
+                'lower': dataStr.lower().encode('utf-8'),
+                'as_is': dataStr.encode('utf-8')
+            }
+        return self._exampleBytes
+
     ###############################################################################
     # Completers go here.
     # See buffer_status.py for which values are available
@@ -199,10 +276,18 @@ class Parser(base_parser.Parser):
     # See core_parser.py for examples
 
     def _exampleCompleter(self, bufferStatus: BufferStatus) -> typing.NoReturn:
-        options = ['upper', 'lower', 'as_is']
-        for option in options:
-            if option.startswith(bufferStatus.being_completed):
-                self.completer.candidates.append(option)
+        prefix = bufferStatus.being_completed
+        candidates = self.completer.candidates
+        if not prefix:
+            # Everything matches.
+            candidates.extend(_EXAMPLE_OPTIONS)
+            return
+        for option in _EXAMPLE_OPTIONS:
+            if option.startswith(prefix):
+                candidates.append(option)
+            elif option > prefix:
+                # The options are sorted, none of the remaining ones can match.
+                break
         return
 
     ###########################################################################
@@ -210,6 +295,10 @@ class Parser(base_parser.Parser):
 
     def __init__(self, application: Application, settings: dict[Enum, typing.Any]):
         super().__init__(application, settings)
+        # Encoded example setting, see _getExampleBytes.
+        self._exampleBytes: typing.Optional[dict[str, bytes]] = None
+        # The DROP_WINDOW setting, kept up to date by setSetting.
+        self._dropWindow: int = self.getSetting(ESettingKey.DROP_WINDOW)
         return
 
     def getSettingKeys(self) -> list[Enum]:
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
 from enum import Enum, auto
+import codecs
+import functools
+import itertools
+import re
 import typing
 
 
@@ -9,71 +13,59 @@ class ERepresentation(Enum):
     PRINTABLE = auto()
 
 
+def _escapeHTML(s: str) -> str:
+    return s.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+# Hex representation of every byte value. None of them need to be escaped.
+_HEX_STRINGS = tuple(f'{b:02X}' for b in range(256))
+
+# Matches an opening tag and captures its name, which is everything up to the first whitespace.
+_TAG_NAME_RE = re.compile(r'<\s*([^\s<>]+)[^<>]*>')
+
+
+# The same few tag strings are used over and over again, so their closing tags are only built once.
+@functools.lru_cache(maxsize=256)
+def _getClosingTags(tags: str) -> str:
+    return ''.join([f'</{tag}>' for tag in reversed(_TAG_NAME_RE.findall(tags))])
+
+
 class ColorSetting:
     def __init__(self, hexTagsOdd: str = None, hexTagsEven: str = None,
                  printableTagsOdd: str = None, printableTagsEven: str = None):
         if hexTagsOdd is None:
             hexTagsOdd = ''
-        self._hexTagsOdd = (hexTagsOdd, self._getClosingTags(hexTagsOdd))
+        self._hexTagsOdd = (hexTagsOdd, _getClosingTags(hexTagsOdd))
 
         if hexTagsEven is None:
             hexTagsEven = hexTagsOdd
-        self._hexTagsEven = (hexTagsEven, self._getClosingTags(hexTagsEven))
+        self._hexTagsEven = (hexTagsEven, _getClosingTags(hexTagsEven))
 
         if printableTagsOdd is None:
             printableTagsOdd = hexTagsOdd
-        self._printableTagsOdd = (printableTagsOdd, self._getClosingTags(printableTagsOdd))
+        self._printableTagsOdd = (printableTagsOdd, _getClosingTags(printableTagsOdd))
 
         if printableTagsEven is None:
             printableTagsEven = hexTagsEven
-        self._printableTagsEven = (printableTagsEven, self._getClosingTags(printableTagsEven))
+        self._printableTagsEven = (printableTagsEven, _getClosingTags(printableTagsEven))
 
         self._hexAttributes = (self._hexTagsOdd, self._hexTagsEven)
         self._printableAttributes = (self._printableTagsOdd, self._printableTagsEven)
         return
 
-    def _getClosingTags(self, tags: str) -> str:
-        if not tags:
-            return ''
-        closingTags = []
-        tagStart = 0
-        tagEnd = -1
-        for idx, c in enumerate(tags):
-            if c == '<':
-                tagStart = idx + 1
-            if c == '>':
-                tagEnd = idx
-            if tagStart <= tagEnd:
-                tagContent = tags[tagStart:tagEnd]
-                tagStart = 0
-                tagEnd = -1
-                tag = tagContent.split()[0]
-                closingTags.insert(0, f'</{tag}>')
-        return ''.join(closingTags)
-
     def __str__(self):
         return f'ColorSetting: {self._hexAttributes=}, {self._printableAttributes=}'
 
     def colorize(self, dataStr: str, isEven: bool = False,
                  representation: ERepresentation = ERepresentation.HEX) -> str:
-        attr = None
-        if representation == ERepresentation.HEX:
-            if self._hexAttributes is not None:
-                if isEven and len(self._hexAttributes) == 2:
-                    attr = self._hexAttributes[1]
-                else:
-                    # odd or not enough attributes in the tuple (only gave the odd one)
-                    attr = self._hexAttributes[0]
-        else:
-            if self._printableAttributes is not None:
-                if isEven and len(self._printableAttributes) == 2:
-                    attr = self._printableAttributes[1]
-                else:
-                    # odd or not enough attributes in the tuple (only gave the odd one)
-                    attr = self._printableAttributes[0]
+        return self.wrap(_escapeHTML(dataStr), isEven, representation)
 
-        dataStr = dataStr.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-        return f'{attr[0]}{dataStr}{attr[1]}'
+    # Same as colorize, but for strings that are already escaped.
+    def wrap(self, escapedStr: str, isEven: bool = False,
+             representation: ERepresentation = ERepresentation.HEX) -> str:
+        attributes = self._hexAttributes if representation is ERepresentation.HEX else self._printableAttributes
+        openingTags, closingTags = attributes[bool(isEven)]
+        return f'{openingTags}{escapedStr}{closingTags}'
 
 
 class EColorSettingKey(Enum):
@@ -91,45 +83,68 @@ class EColorSettingKey(Enum):
     CONTROL = auto()                # ascii control characters (below 0x20)
     NON_PRINTABLE = auto()          # everything else
 
-    def __eq__(self, other) -> bool:
-        if other is int:
-            return self.value == other
-        if other is str:
-            return self.name == other
-        if repr(type(self)) == repr(type(other)):
-            return self.value == other.value
-        return False
 
-    def __gt__(self, other) -> bool:
-        if other is int:
-            return self.value > other
-        if other is str:
-            return self.name > other
-        if repr(type(self)) == repr(type(other)):
-            return self.value > other.value
-        raise ValueError('Can not compare.')
-
-    def __hash__(self):
-        return int.__hash__(self.value)
+# If the length of a representation of a string is of length 3 (example "'A'") then it is printable
+# otherwise the representation would be something like "'\xff'" (len 6).
+# Special case is the backslash since it's representation string is "'\\\\'" (len 6)
+_IS_PRINTABLE = tuple(len(repr(chr(b))) == 3 or repr(chr(b)) == '\'\\\\\'' for b in range(256))
+
+
+# Figures out which class of color setting is used for a byte without a direct setting.
+def _classifyByte(byte: int, printHighAscii: bool) -> EColorSettingKey:
+    isPrintable = _IS_PRINTABLE[byte]
+    isHighAscii = byte >= 0x80
+    isControl = byte < 0x20
+    isDigit = ord('0') <= byte <= ord('9')
+    isLetter = (ord('a') <= byte <= ord('z')) or (ord('A') <= byte <= ord('Z'))
+
+    if (not isPrintable and not isControl) or (not printHighAscii and isHighAscii):
+        # non printable, non control
+        return EColorSettingKey.NON_PRINTABLE
+    if isPrintable and isHighAscii and printHighAscii:
+        # printable high ascii
+        return EColorSettingKey.PRINTABLE_HIGH_ASCII
+    if isControl:
+        # control
+        return EColorSettingKey.CONTROL
+    if isDigit:
+        # printable, digit
+        return EColorSettingKey.DIGITS
+    if isLetter:
+        # printable, letter
+        return EColorSettingKey.LETTERS
+    if isPrintable:
+        # other printable
+        return EColorSettingKey.PRINTABLE
+    raise ValueError(f'Can\'t figure out which color setting to use for {byte:02X}')
+
+
+# Character representation of every byte value, with sep for the ones that aren't printable.
+# Shared by all Hexdump instances with the same separator.
+@functools.lru_cache(maxsize=8)
+def _getRepresentationArray(sep: str) -> str:
+    return ''.join([_IS_PRINTABLE[b] and chr(b) or sep for b in range(256)])
+
+
+# Color setting class of every byte value, indexed by printHighAscii first.
+_BYTE_CLASSES = (
+    tuple(_classifyByte(b, False) for b in range(256)),
+    tuple(_classifyByte(b, True) for b in range(256))
+)
 
 
 class Hexdump():
     def __init__(self, bytesPerLine: int = 16, bytesPerGroup: int = 4,
                  printHighAscii: bool = False, defaultColors: bool = True):
+        self.colorSettings: dict[(typing.Union[EColorSettingKey, int], ColorSetting)] = {}
+        # What the lookup tables were built from, see _getTablesKey.
+        self._tablesKey = None
         self.setBytesPerLine(bytesPerLine)
         self.setBytesPerGroup(bytesPerGroup)
         self.setSep('.')
         self.setPrintHighAscii(printHighAscii)
 
-        # If the length of a representation of a string is of length 3 (example "'A'") then it is printable
-        # otherwise the representation would be something like "'\xff'" (len 6).
-        # So this creates a list of character representations for every possible byte value.
-        # Special case is the backslash since it's representation string is "'\\\\'" (len 6)
-        self.REPRESENTATION_ARRAY = ''.join(
-            [(len(repr(chr(b))) == 3 or repr(chr(b)) == '\'\\\\\'') and chr(b) or self.sep for b in range(256)]
-        )
-
-        self.colorSettings: dict[(typing.Union[EColorSettingKey, int], ColorSetting)] = {}
+        self.REPRESENTATION_ARRAY = _getRepresentationArray(self.sep)
 
         if defaultColors:
             # color available but not set
@@ -191,7 +206,7 @@ class Hexdump():
     def setColorSetting(self, key: typing.Union[EColorSettingKey, int], colorSetting: ColorSetting) -> typing.NoReturn:
         if not isinstance(key, EColorSettingKey) and not isinstance(key, int):
             raise ValueError(f'Key must be of type {repr(EColorSettingKey)} or {repr(int)}')
-        if isinstance(key, int) and not 0x00 >= key >= 0xFF:
+        if isinstance(key, int) and not 0x00 <= key <= 0xFF:
             raise ValueError(f'Key must be within the range of bytes [0x00 .. 0xFF] but was {hex(key)}')
         self.colorSettings[key] = colorSetting
         return
@@ -199,34 +214,112 @@ class Hexdump():
     def unsetColorSetting(self, key: typing.Union[EColorSettingKey, int]) -> typing.NoReturn:
         if not isinstance(key, EColorSettingKey) and not isinstance(key, int):
             raise TypeError(f'Key must be of type {repr(EColorSettingKey)} or {repr(int)}')
-        if isinstance(key, int) and not 0x00 >= key >= 0xFF:
+        if isinstance(key, int) and not 0x00 <= key <= 0xFF:
             raise ValueError(f'Key must be within the range of bytes [0x00 .. 0xFF] but was {key:X}')
 
         if self.colorSettings is not None and key in self.colorSettings:
             self.colorSettings.pop(key)
         return
 
-    # Returns a list of lines of a hexdump.
-    def hexdump(self, src: bytes) -> list[str]:
-        lines = []
+    # Everything the lookup tables are built from. colorSettings and the color settings in it are public and may be
+    # changed directly, so their content is compared instead of relying on the setters.
+    def _getTablesKey(self) -> tuple:
+        colors = None
+        if self.colorSettings is not None:
+            colors = tuple((key, colorSetting._hexAttributes, colorSetting._printableAttributes)
+                           for key, colorSetting in self.colorSettings.items())
+        return (self.sep, self.printHighAscii, colors)
+
+    # Rebuilds the lookup tables if anything they are built from has changed since the last time.
+    def _updateTables(self) -> typing.NoReturn:
+        tablesKey = self._getTablesKey()
+        if tablesKey != self._tablesKey:
+            self._rebuildTables()
+            self._tablesKey = tablesKey
+        return
+
+    # Looks up the color setting of every byte value once, so hexdumps don't have to classify every byte.
+    # Also colorizes the hex and printable representation of every byte value for odd and even positions.
+    def _rebuildTables(self) -> typing.NoReturn:
+        if self.colorSettings is None:
+            self._byteColorTable: list[ColorSetting] = [None] * 256
+        else:
+            self._byteColorTable = [self._findColorSetting(b) for b in range(256)]
+
+        hexOdd, hexEven, printableOdd, printableEven = [], [], [], []
+        for b, colorSetting in enumerate(self._byteColorTable):
+            hexString = _HEX_STRINGS[b]
+            if self.printHighAscii or b <= 127:
+                printableString = self.REPRESENTATION_ARRAY[b]
+            else:
+                # byte > 127 and don't print high ascii
+                printableString = self.sep
+
+            if colorSetting is None:
+                hexOdd.append(hexString)
+                hexEven.append(hexString)
+                printableOdd.append(printableString)
+                printableEven.append(printableString)
+                continue
+            # Every byte value is only escaped once here, instead of once per colorize call.
+            printableString = _escapeHTML(printableString)
+            hexOdd.append(colorSetting.wrap(hexString, False, ERepresentation.HEX))
+            hexEven.append(colorSetting.wrap(hexString, True, ERepresentation.HEX))
+            printableOdd.append(colorSetting.wrap(printableString, False, ERepresentation.PRINTABLE))
+            printableEven.append(colorSetting.wrap(printableString, True, ERepresentation.PRINTABLE))
+
+        # Indexed with isEven first, then with the byte value.
+        self._hexFragments = (tuple(hexOdd), tuple(hexEven))
+        self._printableFragments = (tuple(printableOdd), tuple(printableEven))
+
+        # The spacers and the address colors are the same for every line.
+        self._minorSpacer = self.constructMinorSpacer(' ')
+        self._majorSpacer = self.constructMajorSpacer('   ')
+        addressSetting = None if self.colorSettings is None else self.colorSettings.get(EColorSettingKey.ADDRESS, None)
+        self._addressTags = ('', '') if addressSetting is None else addressSetting._hexTagsOdd
+
+        # When nothing ends up colored, the strings can be built with C level calls instead of loops.
+        plainSpacer = self._minorSpacer == ' '
+        self._plainHex = plainSpacer and hexOdd == hexEven == list(_HEX_STRINGS)
+
+        # Maps every byte value to a single character, for codecs.charmap_decode.
+        self._printableDecodingTable: str = None
+        if plainSpacer and printableOdd == printableEven and all(len(c) == 1 for c in printableOdd):
+            self._printableDecodingTable = ''.join(printableOdd)
+        return
+
+    # Yields the lines of a hexdump one by one, so large dumps are never held in memory at once.
+    def hexdump(self, src: bytes) -> typing.Iterator[str]:
+        self._updateTables()
         maxAddrLen = len(f'{(len(src)):X}')
 
         # Round up to the nearest multiple of 4
         maxAddrLen = (int((maxAddrLen - 1) / 4) + 1) * 4
 
+        # Colorized template for the addresses, same as constructAddress would produce
+        addrPrefix, addrSuffix = self._addressTags
+        addressFormat = f'{addrPrefix.replace("%", "%%")}%0{maxAddrLen}X{addrSuffix.replace("%", "%%")}'
+        majorSpacer = self._majorSpacer
+
+        # Slices of a memoryview don't copy the data of every line.
+        srcView = memoryview(src)
         for addr in range(0, len(src), self.bytesPerLine):
             # The chars we need to process for this line
-            byteArray = src[addr:addr + self.bytesPerLine]
-            lines.append(self.constructLine(addr, maxAddrLen, byteArray))
-        lines.append(self.constructByteTotal(len(src), maxAddrLen))
-        return lines
+            byteArray = srcView[addr:addr + self.bytesPerLine]
+            yield self._constructLine(addressFormat % addr, majorSpacer, byteArray)
+        yield self.constructByteTotal(len(src), maxAddrLen)
+        return
 
     def constructLine(self, address: int, maxAddrLen: int, byteArray: bytes) -> str:
-        addr = self.constructAddress(address, maxAddrLen)
-        hexString = self.constructHexString(byteArray)
-        printableString = self.constructPrintableString(byteArray)
-        majorSpacer = self.constructMajorSpacer('   ')
-        return f'{addr}{majorSpacer}{hexString}{majorSpacer}{printableString}'
+        self._updateTables()
+        return self._constructLine(self.constructAddress(address, maxAddrLen), self._majorSpacer, byteArray)
+
+    # Builds the whole line with a single join over all the fragments.
+    def _constructLine(self, addr: str, majorSpacer: str, byteArray: bytes) -> str:
+        return ''.join([
+            addr, majorSpacer, *self._constructHexParts(byteArray), majorSpacer,
+            '|', *self._constructPrintableParts(byteArray), '|'
+        ])
 
     def constructAddress(self, address: int, maxAddrLen: int) -> str:
         addrString = f'{address:0{maxAddrLen}X}'
@@ -245,94 +338,66 @@ class Hexdump():
         return self.colorSettings[EColorSettingKey.SPACER_MINOR].colorize(spacerStr)
 
     def constructHexString(self, byteArray: bytes) -> str:
-        ret = ''
-        minorSpacerStr = ' '
-        minorSpacer = self.constructMinorSpacer(minorSpacerStr)
+        self._updateTables()
+        return ''.join(self._constructHexParts(byteArray))
 
-        for idx, b in enumerate(byteArray):
-            byteRepr = f'{b:02X}'
-            colorSetting = self.getColorSetting(b)
-            if colorSetting is not None:
-                byteRepr = colorSetting.colorize(byteRepr, idx % 2 == 0, ERepresentation.HEX)
-            ret += byteRepr
+    def _constructHexParts(self, byteArray: bytes) -> list[str]:
+        if self._plainHex:
+            # Without colors bytes.hex does the grouping instead of a loop.
+            return self._addSpacers([byteArray.hex(' ', -self.bytesPerGroup).upper()], byteArray, 2)
 
-            # Add spacers, skip the last spacer if end of byte array
-            if (idx + 1) % self.bytesPerGroup == 0 and (idx + 1) < self.bytesPerLine:
-                ret += minorSpacer
-
-        # Line up all the lines properly
-        ret += minorSpacer * self.getRequiredPaddingLength(byteArray, 2)
-
-        return ret
+        # The first byte is at an even index, so the tables alternate starting with the even one.
+        fragments = list(map(tuple.__getitem__, itertools.cycle(self._hexFragments[::-1]), byteArray))
+        return self._addSpacers(self._groupFragments(fragments), byteArray, 2)
 
     def constructPrintableString(self, byteArray: bytes) -> str:
-        ret = ''
-        minorSpacer = self.constructMinorSpacer(' ')
-        for idx, b in enumerate(byteArray):
-            # store character representation into c
-            c = ''
-            if self.printHighAscii or b <= 127:
-                c = self.REPRESENTATION_ARRAY[b]
-            else:
-                # byte > 127 and don't print high ascii
-                c = self.sep
-
-            # colorize c
-            colorSetting = self.getColorSetting(b)
-            if colorSetting is not None:
-                c = colorSetting.colorize(c, idx % 2 == 0, ERepresentation.PRINTABLE)
-            ret += c
-
-            # Add spacers, skip the last spacer if end of byte array
-            if (idx + 1) % self.bytesPerGroup == 0 and (idx + 1) < self.bytesPerLine:
-                ret += minorSpacer
-
-        # Add padding to line it all up
-        ret += minorSpacer * self.getRequiredPaddingLength(byteArray, 1)
-
-        return f'|{ret}|'
+        self._updateTables()
+        return ''.join(['|', *self._constructPrintableParts(byteArray), '|'])
+
+    def _constructPrintableParts(self, byteArray: bytes) -> list[str]:
+        if self._printableDecodingTable is not None:
+            # Without colors the line is decoded with a table instead of a loop.
+            text, _ = codecs.charmap_decode(byteArray, 'strict', self._printableDecodingTable)
+            return self._addSpacers(self._groupFragments(text), byteArray, 1)
+
+        # The first byte is at an even index, so the tables alternate starting with the even one.
+        fragments = list(map(tuple.__getitem__, itertools.cycle(self._printableFragments[::-1]), byteArray))
+        return self._addSpacers(self._groupFragments(fragments), byteArray, 1)
+
+    # Puts the representations of the bytes of a line into a list, with spacers between the groups.
+    def _groupFragments(self, fragments: typing.Sequence[str]) -> list[str]:
+        group = self.bytesPerGroup
+        minorSpacer = self._minorSpacer
+        parts = []
+        for idx in range(0, len(fragments), group):
+            if idx:
+                parts.append(minorSpacer)
+            parts += fragments[idx:idx + group]
+        return parts
+
+    # Adds the spacer after a full group at the end of a short line and the padding to line it all up.
+    def _addSpacers(self, parts: list[str], byteArray: bytes, lenOfByteRepresentation: int) -> list[str]:
+        minorSpacer = self._minorSpacer
+        if len(byteArray) % self.bytesPerGroup == 0 and 0 < len(byteArray) < self.bytesPerLine:
+            parts.append(minorSpacer)
+        parts.append(minorSpacer * self.getRequiredPaddingLength(byteArray, lenOfByteRepresentation))
+        return parts
+
+    # Returns the color setting that is used for the byte
+    def getColorSetting(self, byte: int) -> ColorSetting:
+        self._updateTables()
+        return self._byteColorTable[byte]
 
     # figure out which color setting is to be used for the byte
-    def getColorSetting(self, byte: int) -> ColorSetting:
+    def _findColorSetting(self, byte: int) -> ColorSetting:
         if self.colorSettings is None:
             return None
 
-        colorSetting = ColorSetting()
-
         # Direct setting is available
         if byte in self.colorSettings:
             return self.colorSettings[byte]
 
-        # Find out which color setting to use.
-        isPrintable = len(repr(chr(byte))) == 3 or repr(chr(byte)) == '\'\\\\\''
-        isHighAscii = byte >= 0x80
-        isControl = byte < 0x20
-        isDigit = ord('0') <= byte <= ord('9')
-        isLetter = (ord('a') <= byte <= ord('z')) or (ord('A') <= byte <= ord('Z'))
-
-        # Find out which color setting to use.
-        colorSettingKey = None
-        if (not isPrintable and not isControl) or (not self.printHighAscii and isHighAscii):
-            # non printable, non control
-            colorSettingKey = EColorSettingKey.NON_PRINTABLE
-        elif isPrintable and isHighAscii and self.printHighAscii:
-            # printable high ascii
-            colorSettingKey = EColorSettingKey.PRINTABLE_HIGH_ASCII
-        elif isControl:
-            # control
-            colorSettingKey = EColorSettingKey.CONTROL
-        elif isDigit:
-            # printable, digit
-            colorSettingKey = EColorSettingKey.DIGITS
-        elif isLetter:
-            # printable, letter
-            colorSettingKey = EColorSettingKey.LETTERS
-        elif isPrintable:
-            # other printable
-            colorSettingKey = EColorSettingKey.PRINTABLE
-        else:
-            raise ValueError(f'Can\'t figure out which color setting to use for {byte:02X}')
-
+        colorSettingKey = _BYTE_CLASSES[self.printHighAscii][byte]
         colorSetting = self.colorSettings.get(colorSettingKey, None)
         if colorSetting is None:
             colorSetting = ColorSetting()
@@ -341,7 +406,7 @@ class Hexdump():
 
     def constructByteTotal(self, totalBytes: int, maxAddrLen: int) -> str:
         maxAddr = self.constructAddress(totalBytes, maxAddrLen)
-        majorSpacer = self.constructMajorSpacer('   ')
+        majorSpacer = self._majorSpacer
         totalBytesString = f'({totalBytes} Bytes)'
         if self.colorSettings is not None and EColorSettingKey.BYTE_TOTAL in self.colorSettings:
             totalBytesString = self.colorSettings[EColorSettingKey.BYTE_TOTAL].colorize(totalBytesString)
@@ -1,8 +1,10 @@
 # This parser simply passes the data through and prints formatted json data
 
 from __future__ import annotations
+import functools
 import typing
 import json
+import re
 
 # This is the base class for the custom parser class
 import base_parser
@@ -18,6 +20,51 @@ if typing.TYPE_CHECKING:
     from enum import Enum
 
 
+# Bytes that can change the state while looking for json objects.
+_JSON_TOKEN_RE = re.compile(rb'[{}"\'\\]')
+_OPEN_BRACE = ord('{')
+_CLOSE_BRACE = ord('}')
+_BACKSLASH = ord('\\')
+_QUOTES = (ord('"'), ord("'"))
+
+# Decoded json never contains reference cycles, so the encoder doesn't need to check for them.
+_JSON_DECODER = json.JSONDecoder()
+_JSON_ENCODER = json.JSONEncoder(indent=2, ensure_ascii=False, check_circular=False)
+
+# Only small json objects are cached, large ones are unlikely to repeat and would take up a lot of memory.
+_JSON_CACHE_MAX_BYTES = 4096
+
+
+# Control channels often repeat the same messages, so small ones are only formatted once.
+@functools.lru_cache(maxsize=64)
+def _reformat_json_cached(data: bytes) -> str:
+    return _reformat_json(data)
+
+
+# Raises UnicodeDecodeError or json.decoder.JSONDecodeError, same as json.loads.
+def _reformat_json(data: bytes) -> str:
+    # Strict, so no lone surrogate ends up in the output, the terminal can't print those.
+    text = data.decode(json.detect_encoding(data))
+    formatted = _JSON_ENCODER.encode(_JSON_DECODER.decode(text))
+    if not formatted.isascii():
+        # Escaped lone surrogates like \ud800 are valid json, but the terminal can't print them. Escape them again.
+        formatted = formatted.encode("utf-8", "backslashreplace").decode("utf-8")
+    return formatted
+
+
+# Colors for formatted json.
+_NORMAL_OPEN = "<lime>"
+_NORMAL_CLOSE = "</lime>"
+_QUOTE = "<orange>\"</orange>"
+_STRING_OPEN = f"{_NORMAL_CLOSE}{_QUOTE}<yellow>"
+_STRING_CLOSE = f"</yellow>{_QUOTE}{_NORMAL_OPEN}"
+_NUMBER_OPEN = f"{_NORMAL_CLOSE}<cyan>"
+_NUMBER_CLOSE = f"</cyan>{_NORMAL_OPEN}"
+
+# Matches either a string or a number in json that was formatted by json.dumps.
+_JSON_COLOR_RE = re.compile(r'"((?:[^"\\]|\\.)*)"|(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)')
+
+
 class Parser(base_parser.Parser):
 
     # Define the parser name here as it should appear in the prompt
@@ -25,110 +72,82 @@ class Parser(base_parser.Parser):
         return 'JSON'
 
     def parse(self, data: bytes, proxy: Proxy, origin: ESocketRole) -> list[str]:
-        output = super().parse(data, proxy, origin)
-
-        output.append(Parser.format_json(data, True))
-
-        # Pass data through to the target.
-        if origin == ESocketRole.CLIENT:
-            proxy.sendToServer(data)
-        else:
-            proxy.sendToClient(data)
-        return output
+        # Pass data through to the target before building the output, so forwarding doesn't wait for the display.
+        proxy.forward(origin, data)
+        return [*super().parse(data, proxy, origin), Parser.format_json(data, True)]
 
-    # Turns a string into an array of strings by carving out json objects
+    # Turns the data into an array of byte strings by carving out json objects
     # and appending them separately from normal text.
     @staticmethod
-    def find_json(string: str) -> list[str]:
-        result = [""]
-        idx = 0  # where we are in the result array
+    def find_json(data: bytes) -> list[bytes]:
+        result = []
+        segmentStart = 0  # where the current piece of text or json object starts
         bracketCount = 0  # used to track how many braces are open
         stringDelimiter = None  # used to prevent false termination when curly brace is inside a json object's string.
-        for char in string:
-            if bracketCount > 0 and char == stringDelimiter and result[idx][-1] != "\\":
-                # exiting a string, was unescaped and matches stringDelimiter
-                stringDelimiter = None
-            elif bracketCount > 0 and char in ("\"", "'") and stringDelimiter is None:
-                # entering a string
-                stringDelimiter = char
-            elif char == "{" and stringDelimiter is None:
+        escapedIdx = -1  # index of the character after a backslash inside a string
+        # Only braces, quotes and backslashes change the state, so everything in between is skipped.
+        for match in _JSON_TOKEN_RE.finditer(data):
+            idx = match.start()
+            char = data[idx]
+            if stringDelimiter is not None:
+                if idx == escapedIdx:
+                    continue
+                if char == _BACKSLASH:
+                    escapedIdx = idx + 1
+                elif char == stringDelimiter:
+                    # exiting a string, was unescaped and matches stringDelimiter
+                    stringDelimiter = None
+            elif char == _OPEN_BRACE:
                 # open bracket outside of a string
                 bracketCount += 1
-                if bracketCount == 1:
-                    # is now a new json object
-                    # Append to result if result is empty, otherwise start a new result string
-                    if result[idx] != "":
-                        idx += 1
-                        result.append("")
-                    else:
-                        result[idx] += "{"
-                        continue
-            elif char == "}" and bracketCount > 0 and stringDelimiter is None:
-                # closing brace outside of string
-                bracketCount -= 1
-                # if it is the last closing brace, start a new result object
-                if bracketCount == 0:
-                    result[idx] += "}"
-                    result.append("")
-                    idx += 1
-                    continue
-            result[idx] += char
-        # remove all empty ones
-        return [item for item in result if item]
+                if bracketCount == 1 and idx > segmentStart:
+                    # is now a new json object, the text before it is a piece of its own
+                    result.append(data[segmentStart:idx])
+                    segmentStart = idx
+            elif bracketCount > 0:
+                if char == _CLOSE_BRACE:
+                    # closing brace outside of string
+                    bracketCount -= 1
+                    # if it is the last closing brace, the json object is complete
+                    if bracketCount == 0:
+                        result.append(data[segmentStart:idx + 1])
+                        segmentStart = idx + 1
+                elif char in _QUOTES:
+                    # entering a string
+                    stringDelimiter = char
+        if segmentStart < len(data):
+            result.append(data[segmentStart:])
+        return result
+
+    # Colors a string or number matched by _JSON_COLOR_RE.
+    @staticmethod
+    def _colorize_json_token(match: re.Match) -> str:
+        string, number = match.groups()
+        if number is not None:
+            return f"{_NUMBER_OPEN}{number}{_NUMBER_CLOSE}"
+        string = string.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        return f"{_STRING_OPEN}{string}{_STRING_CLOSE}"
 
     # Takes in the raw data and turns it into a formatted output.
     @staticmethod
     def format_json(byte_array: bytes, use_colors: bool) -> str:
-        plainString = PlainTextParser.bytes_to_escaped_string(byte_array)
-        jsonObjectArray = Parser.find_json(plainString)
+        jsonObjectArray = Parser.find_json(bytes(byte_array))
         result = ""
 
-        for potentialJsonString in jsonObjectArray:
+        for potentialJson in jsonObjectArray:
             try:
-                formatted_json = json.dumps(json.loads(potentialJsonString), indent=2, ensure_ascii=True)
+                if len(potentialJson) <= _JSON_CACHE_MAX_BYTES:
+                    formatted_json = _reformat_json_cached(potentialJson)
+                else:
+                    formatted_json = _reformat_json(potentialJson)
                 if not use_colors:
                     result += formatted_json + "\n"
+                    continue
 
-                NORMAL_OPEN = "<lime>"
-                NORMAL_CLOSE = "</lime>"
-                QUOTE_OPEN = "<orange>"
-                QUOTE_CLOSE = "</orange>"
-                STRING_OPEN = "<yellow>"
-                STRING_CLOSE = "</yellow>"
-                NUMBER_OPEN = "<cyan>"
-                NUMBER_CLOSE = "</cyan>"
-
-                result += NORMAL_OPEN
-                stringDelimiter = None
-                inNumber = False
-                prevChar = "\x00"
-                for char in formatted_json:
-                    if char in ("\"", "'") and prevChar != "\\":
-                        if stringDelimiter is None:
-                            # entering a string
-                            stringDelimiter = char
-                            result += f"{NORMAL_CLOSE}{QUOTE_OPEN}{char}{QUOTE_CLOSE}{STRING_OPEN}"
-                        elif stringDelimiter == char:
-                            # exiting a string
-                            stringDelimiter = None
-                            result += f"{STRING_CLOSE}{QUOTE_OPEN}{char}{QUOTE_CLOSE}{NORMAL_OPEN}"
-                        else:
-                            # double quote in single quote string or the other way around
-                            result += char
-                    elif (char.isnumeric() or char == '.') and not inNumber and stringDelimiter is None:
-                        # entering a number outside a string
-                        inNumber = True
-                        result += f"{NORMAL_CLOSE}{NUMBER_OPEN}{char}"
-                    elif not (char.isnumeric() or char == '.') and inNumber and stringDelimiter is None:
-                        # exiting a number outside a string
-                        inNumber = False
-                        result += f"{NUMBER_CLOSE}{NORMAL_OPEN}{char}"
-                    else:
-                        result += char
-                    prevChar = char
-
-                result += f"{NORMAL_CLOSE}\n"
-            except json.decoder.JSONDecodeError as ex:
+                # Strings and numbers are colored in one pass, everything else stays in the normal color.
+                colored_json = _JSON_COLOR_RE.sub(Parser._colorize_json_token, formatted_json)
+                result += f"{_NORMAL_OPEN}{colored_json}{_NORMAL_CLOSE}\n"
+            except (json.decoder.JSONDecodeError, UnicodeDecodeError) as ex:
                 divider = "=" * 20
                 if use_colors:
                     result += f"<red><b>Unable to format JSON</b></red>: <orange>{ex}</orange>\n"
@@ -136,7 +155,7 @@ class Parser(base_parser.Parser):
                     result += f"Unable to format JSON: {ex}\n"
                 result += (
                     f"{divider} START OF RAW STRING {divider}\n"
-                    f"{potentialJsonString}\n"
+                    f"{PlainTextParser.bytes_to_escaped_string(potentialJson)}\n"
                     f"{divider} END OF RAW STRING {divider}"
                 )
         return result
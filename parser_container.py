@@ -1,4 +1,5 @@
 from __future__ import annotations
+import time
 import typing
 
 from dynamic_loader import DynamicLoader
@@ -9,6 +10,10 @@ if typing.TYPE_CHECKING:
     from enum import Enum
 
 
+# Seconds between checks whether the parser module has changed, so packets don't each stat the file.
+_RELOAD_CHECK_INTERVAL = 0.25
+
+
 # This class holds parser items imported from module name.
 # When the parser is requested from this class, it will be reloaded if required
 class ParserContainer():
@@ -16,6 +21,7 @@ class ParserContainer():
         self.application = application
         self.dynamicLoader: DynamicLoader = DynamicLoader(moduleName)
         self.instance: Parser.Parser = self.dynamicLoader.getModule().Parser(self.application, {})
+        self._nextReloadCheck = 0.0
         return
 
     def __str__(self) -> str:
@@ -30,6 +36,11 @@ class ParserContainer():
             self.application.setCompleter(self.instance.completer)
 
     def getInstance(self) -> Parser.Parser:
+        now = time.monotonic()
+        if now < self._nextReloadCheck:
+            return self.instance
+        self._nextReloadCheck = now + _RELOAD_CHECK_INTERVAL
+
         if self.dynamicLoader.checkNeedsReload():
             # Save settings
             settings = self.instance.settings
@@ -21,15 +21,10 @@ class Parser(base_parser.Parser):
     def __str__(self) -> str:
         return 'PASS'
 
-    def parse(self, data: bytes, proxy: Proxy, origin: ESocketRole) -> list[str]:
-        output = super().parse(data, proxy, origin)
-
-        # Pass data through to the target.
-        if origin == ESocketRole.CLIENT:
-            proxy.sendToServer(data)
-        else:
-            proxy.sendToClient(data)
-        return output
+    def parse(self, data: bytes, proxy: Proxy, origin: ESocketRole) -> typing.Sequence[str]:
+        # Pass data through to the target before building the output, so forwarding doesn't wait for the display.
+        proxy.forward(origin, data)
+        return super().parse(data, proxy, origin)
 
     def __init__(self, application: Application, settings: dict[Enum, typing.Any]):
         super().__init__(application, settings)
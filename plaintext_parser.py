@@ -1,6 +1,7 @@
 # This parser simply passes the data through and prints plain text instead of hexdump
 
 from __future__ import annotations
+import codecs
 import typing
 
 # This is the base class for the custom parser class
@@ -16,6 +17,21 @@ if typing.TYPE_CHECKING:
     from enum import Enum
 
 
+# Escaped representation of every byte value. Printable ascii and whitespace stay as they are.
+_ESCAPE_TABLE = tuple(
+    "\\\\" if byte == 0x5C
+    else chr(byte) if 0x20 <= byte <= 0x7E or byte in (0x09, 0x0A, 0x0D)
+    else f"\\x{byte:02X}"
+    for byte in range(256)
+)
+
+# codecs.charmap_decode takes a mapping to build the string in C, without a str object per byte.
+_ESCAPE_MAPPING = dict(enumerate(_ESCAPE_TABLE))
+
+# Every byte that represents itself in _ESCAPE_TABLE. Deleting these with bytes.translate leaves only bytes to escape.
+_SELF_REPRESENTING_BYTES = bytes(byte for byte, escaped in enumerate(_ESCAPE_TABLE) if len(escaped) == 1)
+
+
 class Parser(base_parser.Parser):
 
     # Define the parser name here as it should appear in the prompt
@@ -23,35 +39,16 @@ class Parser(base_parser.Parser):
         return 'PLAIN'
 
     def parse(self, data: bytes, proxy: Proxy, origin: ESocketRole) -> list[str]:
-        output = super().parse(data, proxy, origin)
-
-        output.append(Parser.bytes_to_escaped_string(data))
-
-        # Pass data through to the target.
-        if origin == ESocketRole.CLIENT:
-            proxy.sendToServer(data)
-        else:
-            proxy.sendToClient(data)
-        return output
+        # Pass data through to the target before building the output, so forwarding doesn't wait for the display.
+        proxy.forward(origin, data)
+        return [*super().parse(data, proxy, origin), Parser.bytes_to_escaped_string(data)]
 
     @staticmethod
     def bytes_to_escaped_string(byte_array: bytes) -> str:
-        result = ""
-
-        PRINTABLE_ASCII_START = 0x20
-        PRINTABLE_ASCII_END = 0x7E
-        WHITESPACE_CHARACTERS = {0x09, 0x0A, 0x0D}
-        BACKSLASH_ASCII = 0x5C
-
-        for byte in byte_array:
-            if byte == BACKSLASH_ASCII:
-                result += "\\\\"
-            elif PRINTABLE_ASCII_START <= byte <= PRINTABLE_ASCII_END or byte in WHITESPACE_CHARACTERS:
-                result += chr(byte)
-            else:
-                result += f"\\x{byte:02X}"
-
-        return result
+        # Most text needs no escaping at all and can be decoded in one go.
+        if not byte_array.translate(None, _SELF_REPRESENTING_BYTES):
+            return str(byte_array, "ascii")
+        return codecs.charmap_decode(byte_array, "strict", _ESCAPE_MAPPING)[0]
 
     def __init__(self, application: Application, settings: dict[Enum, typing.Any]):
         super().__init__(application, settings)
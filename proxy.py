@@ -8,10 +8,10 @@ import socket
 import select
 
 # Thread safe data structure to hold messages we want to send
-from queue import SimpleQueue
+from collections import deque
 
 # For creating multiple threads
-from threading import Thread, Lock
+from threading import Thread, Lock, Event
 from time import sleep
 
 from enum_socket_role import ESocketRole
@@ -23,6 +23,22 @@ try:
 except ImportError:
     _SETPROCTITLE_AVAILABLE = False
 
+# epoll keeps the registered socket in the kernel instead of passing it in again on every call.
+# select is used on systems that don't have epoll.
+_EPOLL_AVAILABLE = hasattr(select, 'epoll')
+# Waiting ends when the socket is ready or the handler is woken up. The timeout is only a backstop,
+# so stop() is always noticed eventually.
+_POLL_TIMEOUT = 1.0  # in seconds
+
+# Queued messages are sent together with one sendmsg() call where available.
+# Batches are limited in size and in the number of buffers, which the system limits as well.
+_SENDMSG_AVAILABLE = hasattr(socket.socket, 'sendmsg')
+_SEND_BATCH_BYTES = 0x40000
+_SEND_BATCH_BUFFERS = 512
+
+# Data that is already waiting in the socket is read without blocking and passed to the parser in one go.
+_MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0)
+
 if typing.TYPE_CHECKING:
     PHType = typing.Callable[[bytes, 'Proxy', ESocketRole], typing.NoReturn]
     OHType = typing.Callable[[list[str], typing.NoReturn]]
@@ -51,11 +67,17 @@ class Proxy(Thread):
         self._server = None
         self._client = None
 
+        # Send function of the peer for each origin, wired up once both sides are connected.
+        self._peerSend = {}
+
         self._bind(self._bindAddr, self._localPort)
 
         # Lock for other thread calling this thread's functions
         self._lock = Lock()
 
+        # Name the thread title was last set for.
+        self._titleName = None
+
         return
 
     def __str__(self) -> str:
@@ -81,8 +103,9 @@ class Proxy(Thread):
         # after client disconnected await a new client connection until shutdown.
         while not self._isShutdown:
             output = []
-            # update thread title
-            if _SETPROCTITLE_AVAILABLE and setproctitle.getthreadtitle() != self.name[:_PROCTITLE_MAX_CHARS]:
+            # update thread title, only needed when the proxy has been renamed
+            if _SETPROCTITLE_AVAILABLE and self.name is not self._titleName:
+                self._titleName = self.name
                 setproctitle.setthreadtitle(self.name[:_PROCTITLE_MAX_CHARS])
             try:
                 # Wait for a client.
@@ -104,6 +127,9 @@ class Proxy(Thread):
                         self._client = None
                         continue
 
+                    # Data from one side goes straight to the other side's send queue.
+                    self._peerSend = {ESocketRole.CLIENT: self._server.send, ESocketRole.SERVER: self._client.send}
+
                     # Start client and server socket handler threads.
                     self._client.start()
                     self._server.start()
@@ -140,11 +166,22 @@ class Proxy(Thread):
         return
 
     def sendToServer(self, data: bytes) -> typing.NoReturn:
-        self.sendData(ESocketRole.SERVER, data)
+        sh = self._server
+        if sh is not None:
+            sh.send(data)
         return
 
     def sendToClient(self, data: bytes) -> typing.NoReturn:
-        self.sendData(ESocketRole.CLIENT, data)
+        sh = self._client
+        if sh is not None:
+            sh.send(data)
+        return
+
+    # Passes data on to the other side of the connection than where it came from.
+    def forward(self, origin: ESocketRole, data: bytes) -> typing.NoReturn:
+        peerSend = self._peerSend.get(origin)
+        if peerSend is not None:
+            peerSend(data)
         return
 
     def getClient(self) -> typing.Tuple[str, int]:
@@ -177,6 +214,7 @@ class Proxy(Thread):
             return False
 
         # Disconnect the old client if there was one.
+        self._peerSend = {}
         if self._client is not None:
             self._client.stop()
             self._client.join()
@@ -215,6 +253,7 @@ class Proxy(Thread):
 
     def disconnect(self) -> typing.NoReturn:
         with self._lock:
+            self._peerSend = {}
             if self._client is not None:
                 self._client.stop()
                 self._client = None
@@ -238,30 +277,88 @@ class SocketHandler(Thread):
         self._ROLE = role                # Either client or server
         self._proxy = proxy              # To disconnect on error
         self._READ_BUFFER_SIZE = readBufferSize
+        # Data is received into this buffer and copied out with its actual length,
+        # instead of allocating a buffer of the full size for every recv().
+        self._recvView = memoryview(bytearray(readBufferSize))
         self._outputHandler = outputHandler
         self._packetHandler = packetHandler
 
         # Get this once, so there is no need to check for validity of the socket later.
         self._host, self._port = sock.getpeername()
+        # None of this changes, so it is only formatted once.
+        self._str = f'{self._ROLE.name} [{self._host}:{self._port}]'
 
         # Set thread name and initialize thread base class.
         super().__init__(name=self._getName())
 
         # Simple, thread-safe data structure for our messages to the socket to be queued into.
-        self._dataQueue = SimpleQueue()
+        # append() and popleft() are atomic, so no further locking is required.
+        self._dataQueue: deque[bytes] = deque()
+
+        # Set by stop(). Checking an Event doesn't need a lock.
+        self._stopEvent = Event()
 
-        self._running = False
+        # Proxy name the thread title was last set for.
+        self._titleProxyName = None
 
         # Set socket non-blocking. recv() will return if there is no data available.
         self._sock.setblocking(True)
 
-        self._lock = Lock()
+        # Forward small writes right away instead of waiting for more data or an ack.
+        try:
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+
+        # Writing a byte into this pair wakes the thread up while it waits for the socket,
+        # so queued data and stop() are handled right away.
+        self._wakeupReader, self._wakeupWriter = socket.socketpair()
+        self._wakeupReader.setblocking(False)
+        self._wakeupWriter.setblocking(False)
+        # Only one wakeup byte is written until the thread has woken up, so queueing many messages is cheap.
+        self._wakeupPending = False
+
+        # Only readability is polled for. The socket is blocking, so queued data is sent right away and
+        # sendall() waits by itself in the rare case that the send buffer is full.
+        self._poll = None
+        if _EPOLL_AVAILABLE:
+            try:
+                self._poll = select.epoll()
+                self._poll.register(self._sock.fileno(), select.EPOLLIN)
+                self._poll.register(self._wakeupReader.fileno(), select.EPOLLIN)
+            except OSError:
+                self._closeWakeup()
+                raise
 
     def _getName(self) -> str:
         return ('C' if self._ROLE == ESocketRole.CLIENT else 'S') + f'_{self._proxy.name}'
 
     def send(self, data: bytes) -> typing.NoReturn:
-        self._dataQueue.put(data)
+        self._dataQueue.append(data)
+        self._wakeup()
+        return
+
+    def _wakeup(self) -> typing.NoReturn:
+        if self._wakeupPending:
+            return
+        self._wakeupPending = True
+        try:
+            self._wakeupWriter.send(b'\x00')
+        except OSError:
+            # The buffer is full, so a wakeup is pending already, or the handler has been shut down.
+            pass
+        return
+
+    def _drainWakeup(self) -> typing.NoReturn:
+        # Reset only once the pair is empty. While the flag is set no other thread writes, so no byte can arrive
+        # after the last recv() and be swallowed. Anything queued before the reset is seen when the queue is checked
+        # afterwards, anything queued after it writes a new byte.
+        try:
+            while self._wakeupReader.recv(4096):
+                pass
+        except OSError:
+            pass
+        self._wakeupPending = False
         return
 
     def getHost(self) -> str:
@@ -272,76 +369,130 @@ class SocketHandler(Thread):
 
     def stop(self) -> typing.NoReturn:
         # Cleanup of the socket is in the thread itself, in the run() function, to avoid the need for locks.
-        with self._lock:
-            self._running = False
+        self._stopEvent.set()
+        self._wakeup()
+        if self.ident is None and self._sock is not None:
+            # The thread was never started, so run() won't clean up.
+            self._closeWakeup()
+            self._sock.close()
+            self._sock = None
         return
 
+    # Closes the wakeup pair and the poll object, which are created along with the handler.
+    def _closeWakeup(self) -> typing.NoReturn:
+        if self._poll is not None:
+            self._poll.close()
+            self._poll = None
+        self._wakeupReader.close()
+        self._wakeupWriter.close()
+        return
+
+    # Returns whether the socket is ready to read, ready to write and in error.
+    # Sends are attempted without waiting for writability, so the socket is always reported as ready to write.
     def _getSocketStatus(self) -> typing.Tuple[bool, bool, bool]:
         try:
-            readyToRead, readyToWrite, inError = select.select([self._sock,], [self._sock,], [], 3)
-        except select.error:
+            if self._poll is None:
+                readList = [self._sock, self._wakeupReader]
+                readyToRead, _, inError = select.select(readList, [], [], _POLL_TIMEOUT)
+                if self._wakeupReader in readyToRead:
+                    readyToRead.remove(self._wakeupReader)
+                    self._drainWakeup()
+                return (len(readyToRead) > 0, True, len(inError) > 0)
+
+            events = 0
+            wakeupFd = self._wakeupReader.fileno()
+            for fd, event in self._poll.poll(_POLL_TIMEOUT):
+                if fd == wakeupFd:
+                    self._drainWakeup()
+                else:
+                    events |= event
+        except (OSError, ValueError):
             self.stop()
-        return (len(readyToRead) > 0, len(readyToWrite) > 0, inError)
+            return (False, False, True)
+
+        # Hang ups and errors count as readable, so recv() notices them and the connection is closed.
+        readyToRead = events & (select.EPOLLIN | select.EPOLLHUP | select.EPOLLERR) != 0
+        return (readyToRead, True, events & select.EPOLLERR != 0)
 
     def _sendQueue(self, output: list[str]) -> bool:
         abort = False
         try:
             # Send any data which may be in the queue
-            while not self._dataQueue.empty():
-                message = self._dataQueue.get()
-                self._sock.sendall(message)
+            while self._dataQueue:
+                batch = []
+                batchLen = 0
+                while self._dataQueue and batchLen < _SEND_BATCH_BYTES \
+                        and len(batch) < _SEND_BATCH_BUFFERS:
+                    message = self._dataQueue.popleft()
+                    batch.append(message)
+                    batchLen += len(message)
+                self._sendBatch(batch)
         # pylint: disable=broad-except
         except Exception as e:
             output.append(f'[EXCEPT] - xmit data to {self}: {e}')
             abort = True
         return abort
 
+    def _sendBatch(self, batch: list[bytes]) -> typing.NoReturn:
+        if not _SENDMSG_AVAILABLE or len(batch) == 1:
+            for message in batch:
+                self._sock.sendall(message)
+            return
+
+        # sendmsg() may only send a part of the batch, so continue after the last byte that was sent.
+        idx = 0
+        while idx < len(batch):
+            sent = self._sock.sendmsg(batch[idx:])
+            while idx < len(batch) and sent >= len(batch[idx]):
+                sent -= len(batch[idx])
+                idx += 1
+            if sent > 0:
+                batch[idx] = memoryview(batch[idx])[sent:]
+        return
+
     def __str__(self) -> str:
-        return f'{self._ROLE.name} [{self._host}:{self._port}]'
+        return self._str
 
     def run(self) -> typing.NoReturn:
         if self._sock is None:
             raise RuntimeError('Socket has expired. Can not start again after shutdown.')
 
-        with self._lock:
-            self._running = True
-        localRunning = True
+        # These don't change while running, bind them once instead of looking them up every iteration.
+        isStopped = self._stopEvent.is_set
+        proxy = self._proxy
+        dataQueue = self._dataQueue
+        outputHandler = self._outputHandler
+        getSocketStatus = self._getSocketStatus
+        recvData = self._recvData
+        sendQueue = self._sendQueue
 
         # run until stop() is called.
-        while localRunning:
+        while not isStopped():
             output = []
-            data = False
             abort = False
 
-            # Update thread title
-            if _SETPROCTITLE_AVAILABLE and setproctitle.getthreadtitle() != self._getName()[:_PROCTITLE_MAX_CHARS]:
+            # Update thread title, only needed when the proxy has been renamed
+            if _SETPROCTITLE_AVAILABLE and proxy.name is not self._titleProxyName:
+                self._titleProxyName = proxy.name
                 setproctitle.setthreadtitle(self._getName()[:_PROCTITLE_MAX_CHARS])
 
             try:  # Try-Finally block for output.
-                readyToRead, readyToWrite, _ = self._getSocketStatus()
+                readyToRead, readyToWrite, _ = getSocketStatus()
 
                 # Receive data from the host.
                 if readyToRead:
-                    data, abort = self._recvData(output)
+                    _, abort = recvData(output)
 
                 # Send the queue
-                queueEmpty = self._dataQueue.empty()
+                queueEmpty = not dataQueue
                 abort2 = False
                 if not queueEmpty and readyToWrite:
-                    abort2 = self._sendQueue(output)
+                    abort2 = sendQueue(output)
 
                 if abort or abort2:
-                    self._proxy.disconnect()
-
-                # Prevent the CPU from Melting
-                # Sleep if we didn't get any data and if we don't have anything to send or can't send
-                if not data and (queueEmpty or not readyToWrite):
-                    sleep(0.001)
-
-                with self._lock:
-                    localRunning = self._running
+                    proxy.disconnect()
             finally:
-                self._outputHandler(output)
+                outputHandler(output)
         output = []
         try:
             # Stopped, clean up socket.
@@ -350,21 +501,42 @@ class SocketHandler(Thread):
             self._sendQueue(output)
             sleep(0.1)
 
+            self._closeWakeup()
             self._sock.close()
             self._sock = None
         finally:
             self._outputHandler(output)
         return
 
+    # Reads whatever else is waiting in the socket after offset, so small reads don't each go through the parser.
+    # Returns the number of additional bytes. Disconnects and errors are left for the next recv to report.
+    def _drainSocket(self, offset: int) -> int:
+        if not _MSG_DONTWAIT:
+            return 0
+        drained = 0
+        view = self._recvView
+        while offset + drained < len(view):
+            try:
+                dataLen = self._sock.recv_into(view[offset + drained:], 0, _MSG_DONTWAIT)
+            except OSError:
+                break
+            if dataLen == 0:
+                break
+            drained += dataLen
+        return drained
+
     def _recvData(self, output: list[str]) -> bool:
         data = False
         abort = False
 
         # pylint: disable=broad-except
         try:
-            data = self._sock.recv(self._READ_BUFFER_SIZE)
-            if len(data) == 0:
+            dataLen = self._sock.recv_into(self._recvView)
+            if dataLen == 0:
                 raise IOError('Socket Disconnected')
+            dataLen += self._drainSocket(dataLen)
+            # Parsers may keep the data, so they get their own copy.
+            data = bytes(self._recvView[:dataLen])
         except BlockingIOError:
             # No data was available at the time.
             pass